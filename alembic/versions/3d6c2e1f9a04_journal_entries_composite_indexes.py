@@ -0,0 +1,50 @@
+"""Journal entries composite indexes
+
+Revision ID: 3d6c2e1f9a04
+Revises: f909b4acb52f
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d6c2e1f9a04'
+down_revision = 'f909b4acb52f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Indexes are built concurrently to not lock journal_entries for writes,
+    # CREATE INDEX CONCURRENTLY can not run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_journal_entries_journal_id_created_at',
+            'journal_entries',
+            ['journal_id', 'created_at'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_journal_entries_journal_id_context_type_context_id',
+            'journal_entries',
+            ['journal_id', 'context_type', 'context_id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_journal_entries_journal_id_context_type_context_id',
+            table_name='journal_entries',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_journal_entries_journal_id_created_at',
+            table_name='journal_entries',
+            postgresql_concurrently=True,
+        )
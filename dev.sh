@@ -6,4 +6,4 @@ set -e
 SPIRE_HOST="${SPIRE_HOST:-0.0.0.0}"
 SPIRE_PORT="${SPIRE_PORT:-7475}"
 
-uvicorn --port "$SPIRE_PORT" --host "$SPIRE_HOST" spire.api:app --workers 2 $@
+uvicorn --port "$SPIRE_PORT" --host "$SPIRE_HOST" spire.api:app --loop uvloop --workers 2 $@
@@ -42,9 +42,11 @@ setup(
         "cryptography",
         "docutils",
         "elasticsearch==7.8.1",
+        "eth-hash[pycryptodome]",
         "fastapi>=0.75.0",
         "httptools",
         "multidict",
+        "orjson",
         "protobuf==3.19.1",
         "psycopg2-binary>=2.9.1",
         "pydantic<=1.10.2",
@@ -56,7 +58,6 @@ setup(
         "typed-ast",
         "uvicorn>=0.17.6",
         "uvloop",
-        "web3>=5.30.0",
         "websockets",
         "yarl",
     ],
@@ -28,14 +28,20 @@ def create_spire_engine(
     max_overflow: int,
     statement_timeout: int,
     pool_recycle: int = SPIRE_DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping: bool = True,
+    pool_use_lifo: bool = True,
 ):
     # Pooling: https://docs.sqlalchemy.org/en/14/core/pooling.html#sqlalchemy.pool.QueuePool
     # Statement timeout: https://stackoverflow.com/a/44936982
+    # Pre ping drops connections closed by server or proxy before they are handed to a request,
+    # LIFO keeps reusing recently returned connections so idle ones can expire by pool_recycle.
     return create_engine(
         url=url,
         pool_size=pool_size,
         pool_recycle=pool_recycle,
         max_overflow=max_overflow,
+        pool_pre_ping=pool_pre_ping,
+        pool_use_lifo=pool_use_lifo,
         connect_args={"options": f"-c statement_timeout={statement_timeout}"},
     )
 
@@ -3,14 +3,39 @@ Elasticsearch clients
 """
 from contextlib import contextmanager
 import os
+from typing import Any, AsyncIterator, Dict, Optional
 
 import elasticsearch
+from elasticsearch.serializer import JSONSerializer
+import orjson
 
 
-def es_client_from_env() -> elasticsearch.Elasticsearch:
+class ORJSONSerializer(JSONSerializer):
+    """
+    Elasticsearch JSON serializer backed by orjson. Types orjson does not support natively
+    (decimals, for example) fall back to the default conversion of JSONSerializer.
+    """
+
+    def loads(self, s):
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError as e:
+            raise elasticsearch.SerializationError(s, e)
+
+    def dumps(self, data):
+        # Bulk helpers pass already serialized lines
+        if isinstance(data, str):
+            return data
+        try:
+            return orjson.dumps(data, default=self.default).decode()
+        except TypeError as e:
+            raise elasticsearch.SerializationError(data, e)
+
+
+def es_client_kwargs_from_env() -> Dict[str, Any]:
     """
-    Create an elasticsearch client using configuration from environment variables. Respects the
-    following environment variables:
+    Builds elasticsearch client arguments using configuration from environment variables. Respects
+    the following environment variables:
     - ELASTICSEARCH_USER
     - ELASTICSEARCH_PASSWORD
     - ELASTICSEARCH_HOSTS
@@ -29,8 +54,23 @@ def es_client_from_env() -> elasticsearch.Elasticsearch:
     kwargs = {
         "hosts": hosts,
         "http_auth": http_auth,
+        "serializer": ORJSONSerializer(),
     }
-    return elasticsearch.Elasticsearch(**kwargs)
+    return kwargs
+
+
+def es_client_from_env() -> elasticsearch.Elasticsearch:
+    """
+    Create an elasticsearch client using configuration from environment variables.
+    """
+    return elasticsearch.Elasticsearch(**es_client_kwargs_from_env())
+
+
+def async_es_client_from_env() -> elasticsearch.AsyncElasticsearch:
+    """
+    Create an asynchronous elasticsearch client using configuration from environment variables.
+    """
+    return elasticsearch.AsyncElasticsearch(**es_client_kwargs_from_env())
 
 
 def yield_es_client_from_env() -> elasticsearch.Elasticsearch:
@@ -43,3 +83,29 @@ def yield_es_client_from_env() -> elasticsearch.Elasticsearch:
 
 
 yield_es_client_from_env_ctx = contextmanager(yield_es_client_from_env)
+
+
+AsyncESClient: Optional[elasticsearch.AsyncElasticsearch] = None
+
+
+async def yield_async_es_client_from_env() -> AsyncIterator[
+    elasticsearch.AsyncElasticsearch
+]:
+    """
+    Yields an asynchronous elasticsearch client. The client is created once per process and
+    shared between requests, so its connection pool is reused.
+    """
+    global AsyncESClient
+    if AsyncESClient is None:
+        AsyncESClient = async_es_client_from_env()
+    yield AsyncESClient
+
+
+async def close_async_es_client() -> None:
+    """
+    Closes the shared asynchronous elasticsearch client, if it was created.
+    """
+    global AsyncESClient
+    if AsyncESClient is not None:
+        await AsyncESClient.close()
+        AsyncESClient = None
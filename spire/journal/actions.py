@@ -2,23 +2,29 @@
 Journal-related actions in Spire
 """
 import calendar
-import json
 import logging
 import os
 import time
 from datetime import date, datetime, timedelta
-from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple, Union
 from uuid import UUID, uuid4
 
 import boto3
+import orjson
+from brood.models import utcnow
 from fastapi import HTTPException, Request
-from sqlalchemy import and_, func, or_, select, text
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, func, insert, or_, select, text
 from sqlalchemy.dialects import postgresql
-from sqlalchemy.orm import Query, Session
+from sqlalchemy.orm import Query, Session, defer, joinedload, selectinload
 
 from ..broodusers import bugout_api
 from ..utils.confparse import scope_conf
-from ..utils.settings import BUGOUT_CLIENT_ID_HEADER
+from ..utils.settings import (
+    BUGOUT_CLIENT_ID_HEADER,
+    SPIRE_PERMISSIONS_CACHE_MAX_SIZE,
+    SPIRE_PERMISSIONS_CACHE_TTL_SECONDS,
+)
 from .data import (
     ContextSpec,
     CreateEntriesTagsRequest,
@@ -81,9 +87,9 @@ class EntriesNotFound(Exception):
     Raised on actions that involve journal entries which are not present in the database.
     """
 
-    def __init__(self, message: str, entries: List[UUID] = []):
+    def __init__(self, message: str, entries: Optional[List[UUID]] = None):
         super().__init__(message)
-        self.entries = entries
+        self.entries = entries if entries is not None else []
 
 
 class EntryLocked(Exception):
@@ -116,6 +122,64 @@ class CommitFailed(Exception):
     """
 
 
+PermissionsCacheKey = Tuple[str, str, FrozenSet[str]]
+
+
+class PermissionsCache:
+    """
+    Short-lived in-process cache of journal ACLs keyed by journal, user and user groups.
+
+    Permission changes made through this process invalidate the journal entries right away, other
+    processes pick them up once the TTL expires. Only read checks are served from the cache.
+    """
+
+    def __init__(self, ttl: float, max_size: int) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: Dict[
+            PermissionsCacheKey, Tuple[float, Dict[HolderType, List[str]]]
+        ] = {}
+
+    @staticmethod
+    def key(
+        journal_id: Union[str, UUID], user_id: str, user_group_ids: List[str]
+    ) -> PermissionsCacheKey:
+        return (str(journal_id), user_id, frozenset(user_group_ids))
+
+    def get(self, key: PermissionsCacheKey) -> Optional[Dict[HolderType, List[str]]]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, acl = item
+        if expires_at < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return acl
+
+    def set(self, key: PermissionsCacheKey, acl: Dict[HolderType, List[str]]) -> None:
+        if key not in self._entries and len(self._entries) >= self.max_size:
+            # Evict the oldest entry
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (time.monotonic() + self.ttl, acl)
+
+    def invalidate_journal(self, journal_id: Union[str, UUID]) -> None:
+        journal_id_str = str(journal_id)
+        for key in [key for key in self._entries if key[0] == journal_id_str]:
+            self._entries.pop(key, None)
+
+
+permissions_cache = PermissionsCache(
+    ttl=SPIRE_PERMISSIONS_CACHE_TTL_SECONDS, max_size=SPIRE_PERMISSIONS_CACHE_MAX_SIZE
+)
+
+# Scopes which are allowed to be checked against cached ACLs, revoked permissions for
+# anything else must take effect immediately
+CACHEABLE_PERMISSION_SCOPES: Set[Union[JournalScopes, JournalEntryScopes]] = {
+    JournalScopes.READ,
+    JournalEntryScopes.READ,
+}
+
+
 def bugout_client_id_from_request(request: Request) -> Optional[str]:
     """
     Returns Bugout search client ID from request if it has been passed.
@@ -211,7 +275,7 @@ def acl_check(
         raise PermissionsNotFound("No permissions for requested information")
 
 
-def ensure_journal_permission(
+async def ensure_journal_permission(
     db_session: Session,
     user_id: str,
     user_group_ids: List[str],
@@ -224,9 +288,26 @@ def ensure_journal_permission(
 
     Returns: None if the user is a holder of that scope, and raises the appropriate HTTPException
     otherwise.
+
+    Permissions query is executed in threadpool to not block the event loop. Resolved ACLs are
+    cached for a short period, on cache hit only the journal itself is fetched. Checks of
+    write, update and delete scopes always go to the database.
     """
+    cache_key = PermissionsCache.key(journal_id, user_id, user_group_ids)
     try:
-        journal, acl = acl_auth(db_session, user_id, user_group_ids, journal_id)
+        acl = None
+        if required_scopes.issubset(CACHEABLE_PERMISSION_SCOPES):
+            acl = permissions_cache.get(cache_key)
+        if acl is None:
+            journal, acl = await run_in_threadpool(
+                acl_auth, db_session, user_id, user_group_ids, journal_id
+            )
+            permissions_cache.set(cache_key, acl)
+        else:
+            journal = await run_in_threadpool(db_session.get, Journal, journal_id)
+            if journal is None:
+                permissions_cache.invalidate_journal(journal_id)
+                raise PermissionsNotFound("No permissions for requested information")
         acl_check(acl, required_scopes)
     except PermissionsNotFound:
         logger.error(
@@ -339,7 +420,7 @@ async def find_journal(
     if journal_spec.name is not None:
         query = query.filter(Journal.name == journal_spec.name)
 
-    journal = query.one_or_none()
+    journal = await run_in_threadpool(query.one_or_none)
     if journal is None:
         raise JournalNotFound(
             f"Did not find journal with specification: {repr(journal_spec)}"
@@ -348,22 +429,27 @@ async def find_journal(
     return journal
 
 
+def get_journal_with_permissions(db_session: Session, journal_id: UUID) -> Journal:
+    """
+    Returns journal by its id with permissions loaded in the same round of queries, so accessing
+    journal.permissions does not trigger lazy loading.
+    """
+    journal = (
+        db_session.query(Journal)
+        .options(selectinload(Journal.permissions))
+        .filter(Journal.id == journal_id)
+        .one()
+    )
+    return journal
+
+
 async def create_journal(
     db_session: Session, journal_request: CreateJournalRequest
 ) -> Journal:
     """
     Creates the journal specified by the journal_request in the database represented by db_session.
-    Returns nothing.
+    Returns created journal with loaded permissions.
     """
-    # Create new journal
-    journal = Journal(
-        bugout_user_id=journal_request.bugout_user_id,
-        name=journal_request.name,
-        search_index=journal_request.search_index,
-    )
-    db_session.add(journal)
-    db_session.commit()
-
     # Extract all possible permissions from OAuthScopes for journal
     journal_scopes = (
         db_session.query(SpireOAuthScopes)
@@ -371,18 +457,26 @@ async def create_journal(
         .all()
     )
 
-    # Create journal permissions
-    for journal_scope in journal_scopes:
-        journal_p = JournalPermissions(
+    # Create new journal with journal permissions
+    journal_id = uuid4()
+    journal = Journal(
+        id=journal_id,
+        bugout_user_id=journal_request.bugout_user_id,
+        name=journal_request.name,
+        search_index=journal_request.search_index,
+    )
+    journal.permissions = [
+        JournalPermissions(
             holder_type=HolderType.user,
-            journal_id=journal.id,
             holder_id=journal_request.bugout_user_id,
             permission=journal_scope.scope,
         )
-        db_session.add(journal_p)
+        for journal_scope in journal_scopes
+    ]
+    db_session.add(journal)
     db_session.commit()
 
-    return journal
+    return get_journal_with_permissions(db_session, journal_id)
 
 
 async def update_journal(
@@ -402,12 +496,13 @@ async def update_journal(
         user_group_id_list=user_group_id_list,
     )
 
+    journal_id = journal.id
     if update_spec.name is not None:
         journal.name = update_spec.name
 
     db_session.add(journal)
     db_session.commit()
-    return journal
+    return get_journal_with_permissions(db_session, journal_id)
 
 
 async def delete_journal(
@@ -425,11 +520,12 @@ async def delete_journal(
         journal_spec=journal_spec,
         user_group_id_list=user_group_id_list,
     )
-    db_session.query(Journal).filter(Journal.id == journal.id).update(
+    journal_id = journal.id
+    db_session.query(Journal).filter(Journal.id == journal_id).update(
         {Journal.deleted: True}
     )
     db_session.commit()
-    return journal
+    return get_journal_with_permissions(db_session, journal_id)
 
 
 async def journal_statistics(
@@ -591,11 +687,18 @@ async def create_journal_entry(
         commit_list.extend(tags)
 
     db_session.add_all(commit_list)
-    db_session.commit()
+    await run_in_threadpool(db_session.commit)
 
     return entry, entry_lock
 
 
+# Entries pack request type to representation of its entries and field with entries list
+ENTRIES_PACK_REPRESENTATIONS: Dict[type, Tuple[EntryRepresentationTypes, str]] = {
+    JournalEntryListContent: (EntryRepresentationTypes.ENTRY, "entries"),
+    EntityList: (EntryRepresentationTypes.ENTITY, "entities"),
+}
+
+
 async def create_journal_entries_pack(
     db_session: Session,
     journal_id: UUID,
@@ -604,28 +707,26 @@ async def create_journal_entries_pack(
     """
     Bulk pack of entries to database.
     """
-    representation: EntryRepresentationTypes
-    if type(entries_pack_request) == JournalEntryListContent:
-        representation = EntryRepresentationTypes.ENTRY
-    elif type(entries_pack_request) == EntityList:
-        representation = EntryRepresentationTypes.ENTITY
+    pack_representation = ENTRIES_PACK_REPRESENTATIONS.get(type(entries_pack_request))
+    if pack_representation is None:
+        raise InvalidParameters(
+            f"Unsupported entries pack type: {type(entries_pack_request).__name__}"
+        )
+    representation, entries_field = pack_representation
 
     entries_response = ListJournalEntriesResponse(entries=[])
 
     chunk_size = 50
-    e_list = []
-    if representation == EntryRepresentationTypes.ENTRY:
-        e_list = entries_pack_request.entries
-    elif representation == EntryRepresentationTypes.ENTITY:
-        e_list = entries_pack_request.entities
+    e_list = getattr(entries_pack_request, entries_field)
     chunks = [e_list[i : i + chunk_size] for i in range(0, len(e_list), chunk_size)]
     logger.info(
         f"Entries pack split into to {len(chunks)} chunks for journal {str(journal_id)}"
     )
 
     for chunk in chunks:
-        entries_pack = []
-        entries_tags_pack = []
+        entries_rows: List[Dict[str, Any]] = []
+        entries_tags_rows: List[Dict[str, Any]] = []
+        chunk_tags: Dict[UUID, List[str]] = {}
 
         for entry_request in chunk:
             entry_id = uuid4()
@@ -641,58 +742,72 @@ async def create_journal_entries_pack(
                 title, tags, content_raw = parse_entity_to_entry(
                     create_entity=entry_request,
                 )
-                content = json.dumps(content_raw)
-
-            entries_pack.append(
-                JournalEntry(
-                    id=entry_id,
-                    journal_id=journal_id,
-                    title=title,
-                    content=content,
-                    context_id=entry_request.context_id,
-                    context_url=entry_request.context_url,
-                    context_type=entry_request.context_type,
-                    created_at=entry_request.created_at,
+                content = orjson.dumps(content_raw).decode()
+
+            entries_rows.append(
+                {
+                    "id": entry_id,
+                    "journal_id": journal_id,
+                    "title": title,
+                    "content": content,
+                    "context_id": entry_request.context_id,
+                    "context_url": entry_request.context_url,
+                    "context_type": entry_request.context_type
+                    if entry_request.context_type is not None
+                    else "bugout",
+                    "version_id": 1,
+                    "created_at": entry_request.created_at
+                    if entry_request.created_at is not None
+                    else utcnow(),
+                }
+            )
+            chunk_tags[entry_id] = tags if tags is not None else []
+            entries_tags_rows.extend(
+                {"id": uuid4(), "journal_entry_id": entry_id, "tag": tag}
+                for tag in chunk_tags[entry_id]
+                if tag
+            )
+
+        # Single multi-row INSERT per chunk, server generated timestamps are
+        # returned in the same round trip instead of being fetched afterwards
+        inserted_rows = db_session.execute(
+            insert(JournalEntry)
+            .values(entries_rows)
+            .returning(
+                JournalEntry.id, JournalEntry.created_at, JournalEntry.updated_at
+            )
+        ).all()
+        if entries_tags_rows:
+            db_session.execute(
+                postgresql.insert(JournalEntryTag)
+                .values(entries_tags_rows)
+                .on_conflict_do_nothing(
+                    index_elements=[
+                        JournalEntryTag.journal_entry_id,
+                        JournalEntryTag.tag,
+                    ]
                 )
             )
-            if tags is not None:
-                entries_tags_pack += [
-                    JournalEntryTag(journal_entry_id=entry_id, tag=tag)
-                    for tag in tags
-                    if tag
-                ]
 
+        timestamps = {row.id: (row.created_at, row.updated_at) for row in inserted_rows}
+        for entry_row in entries_rows:
+            created_at, updated_at = timestamps[entry_row["id"]]
             entries_response.entries.append(
                 JournalEntryResponse(
-                    id=entry_id,
-                    title=title,
-                    content=content,
-                    tags=tags if tags is not None else [],
-                    context_url=entry_request.context_url,
-                    context_type=entry_request.context_type,
-                    context_id=entry_request.context_id,
-                    created_at=entry_request.created_at,
+                    id=entry_row["id"],
+                    title=entry_row["title"],
+                    content=entry_row["content"],
+                    tags=chunk_tags[entry_row["id"]],
+                    context_url=entry_row["context_url"],
+                    context_type=entry_row["context_type"],
+                    context_id=entry_row["context_id"],
+                    created_at=created_at,
+                    updated_at=updated_at,
                 )
             )
 
-        db_session.bulk_save_objects(entries_pack)
-        db_session.commit()
-        db_session.bulk_save_objects(entries_tags_pack)
-        db_session.commit()
-
-        # Append created_at and updated_at from fresh rows from database
-        # TODO(kompotkot): Datetime now not returned from bult_save_objects()
-        for entry in [
-            e1
-            for e1 in entries_response.entries
-            if e1.id in [e2.id for e2 in entries_pack]
-        ]:
-            entry.created_at = list(filter(lambda x: x.id == entry.id, entries_pack))[
-                0
-            ].created_at
-            entry.updated_at = list(filter(lambda x: x.id == entry.id, entries_pack))[
-                0
-            ].updated_at
+    # Whole pack is written in one transaction
+    db_session.commit()
 
     return entries_response
 
@@ -705,10 +820,13 @@ async def get_journal_entries(
     context_spec: Optional[ContextSpec] = None,
     limit: Optional[int] = 10,
     offset: int = 0,
+    include_content: bool = True,
 ) -> List[JournalEntry]:
     """
     Returns a list of journal entries corresponding to the specified journal. If you specify an
     entry_id, returns that specific entry (still in a list).
+
+    With include_content=False content of entries is not loaded from database.
     """
     journal = await find_journal(
         db_session=db_session,
@@ -727,7 +845,12 @@ async def get_journal_entries(
             query = query.filter(JournalEntry.context_url == context_spec.context_url)
     query = query.order_by(JournalEntry.created_at)
     query = query.limit(limit).offset(offset)
-    return query.all()
+    query = query.options(
+        selectinload(JournalEntry.tags), selectinload(JournalEntry.entry_lock)
+    )
+    if not include_content:
+        query = query.options(defer(JournalEntry.content))
+    return await run_in_threadpool(query.all)
 
 
 async def get_journal_entry(
@@ -749,33 +872,20 @@ async def get_journal_entry_with_tags(
 ) -> Tuple[JournalEntry, List[JournalEntryTag], JournalEntryLock]:
     """
     Returns a journal entry by its id with tags.
+
+    Lock is joined to the entry row, tags are loaded with separate SELECT ... IN so large
+    entry content is not repeated in the result for every tag.
     """
-    objects = (
-        db_session.query(JournalEntry, JournalEntryTag, JournalEntryLock)
-        .join(
-            JournalEntryTag,
-            JournalEntryTag.journal_entry_id == JournalEntry.id,
-            isouter=True,
-        )
-        .join(
-            JournalEntryLock,
-            JournalEntryLock.journal_entry_id == JournalEntry.id,
-            isouter=True,
-        )
+    query = (
+        db_session.query(JournalEntry)
         .filter(JournalEntry.id == journal_entry_id)
-        .all()
+        .options(selectinload(JournalEntry.tags), joinedload(JournalEntry.entry_lock))
     )
-    if len(objects) == 0:
+    entry = await run_in_threadpool(query.one_or_none)
+    if entry is None:
         raise EntryNotFound("Entry not found")
 
-    entry = objects[0][0]
-    entry_lock = objects[0][2]
-    tags: List[JournalEntryTag] = []
-    for object in objects:
-        if object[1] is not None:
-            tags.append(object[1])
-
-    return entry, tags, entry_lock
+    return entry, list(entry.tags), entry.entry_lock
 
 
 async def get_journal_entries_with_tags(
@@ -872,7 +982,7 @@ async def update_journal_entry(
     commit_list.append(entry_lock)
 
     db_session.add_all(commit_list)
-    db_session.commit()
+    await run_in_threadpool(db_session.commit)
 
     return journal_entry, entry_lock
 
@@ -890,14 +1000,14 @@ async def delete_journal_entry(
         .filter(JournalEntry.journal_id == journal.id)
         .filter(JournalEntry.id == entry_id)
     )
-    entry = query.one_or_none()
+    entry = await run_in_threadpool(query.one_or_none)
     if entry is None:
         raise EntryNotFound(
             f"Could not find the journal entry with id: {str(entry_id)}"
         )
 
     db_session.delete(entry)
-    db_session.commit()
+    await run_in_threadpool(db_session.commit)
     return entry
 
 
@@ -1096,6 +1206,36 @@ async def create_journal_entry_tags(
     return new_tags
 
 
+async def bulk_insert_tags(
+    db_session: Session, journal_entry_id: UUID, tags: List[str]
+) -> List[str]:
+    """
+    Tags the given journal entry with a single INSERT statement, tags the entry already has are
+    skipped. Returns list of inserted tags.
+    """
+    if not tags:
+        return []
+
+    query = (
+        postgresql.insert(JournalEntryTag)
+        .values(
+            [
+                {"id": uuid4(), "journal_entry_id": journal_entry_id, "tag": tag}
+                for tag in tags
+            ]
+        )
+        .on_conflict_do_nothing(
+            index_elements=[JournalEntryTag.journal_entry_id, JournalEntryTag.tag]
+        )
+        .returning(JournalEntryTag.tag)
+    )
+    result = await run_in_threadpool(db_session.execute, query)
+    inserted_tags = list(result.scalars())
+    await run_in_threadpool(db_session.commit)
+
+    return inserted_tags
+
+
 async def get_journal_entry_tags(
     db_session: Session,
     journal_spec: JournalSpec,
@@ -1334,7 +1474,7 @@ def store_search_results(
         "offset": offset,
         "response": response.dict(),
     }
-    result_bytes = json.dumps(result).encode("utf-8")
+    result_bytes = orjson.dumps(result)
     result_key = f"{prefix}/{result_id}.json"
 
     s3 = boto3.client("s3")
@@ -1480,6 +1620,7 @@ async def update_journal_scopes(
         )
         db_session.add(journal_p)
     db_session.commit()
+    permissions_cache.invalidate_journal(journal_id)
 
     return permission_list
 
@@ -1529,6 +1670,7 @@ async def delete_journal_scopes(
         db_session.delete(journal_p_delete)
 
     db_session.commit()
+    permissions_cache.invalidate_journal(journal_id)
 
     return permission_list
 
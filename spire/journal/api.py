@@ -1,11 +1,12 @@
+import hashlib
 import logging
-from datetime import datetime
 from typing import Any, Dict, List, Optional, Set, Tuple, Union, cast
 from uuid import UUID
 
 import boto3
+import orjson
 import requests  # type: ignore
-from elasticsearch import Elasticsearch
+from elasticsearch import AsyncElasticsearch, RequestError
 from fastapi import (
     BackgroundTasks,
     Body,
@@ -15,6 +16,7 @@ from fastapi import (
     Path,
     Query,
     Request,
+    Response,
 )
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
@@ -83,7 +85,12 @@ from .data import (
     UpdateJournalSpec,
     UpdateStatsRequest,
 )
-from .representations import journal_representation_parsers
+from .representations import (
+    SpireORJSONResponse,
+    get_parsers,
+    orjson_default,
+    representation_entries_paths,
+)
 from .version import SPIRE_JOURNALS_VERSION
 
 SUBMODULE_NAME = "journals"
@@ -113,6 +120,7 @@ app = FastAPI(
     else None,
     docs_url=None,
     redoc_url=f"/{DOCS_TARGET_PATH}",
+    default_response_class=SpireORJSONResponse,
 )
 
 # Important to save consistency for middlewares (stack queue)
@@ -126,6 +134,11 @@ app.add_middleware(
 app.add_middleware(BroodAuthMiddleware, whitelist=DOCS_PATHS)
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    await es.close_async_es_client()
+
+
 @app.get("/version", response_model=VersionResponse)
 async def version() -> VersionResponse:
     """
@@ -184,7 +197,7 @@ async def get_journal_scopes_handler(
     \f
     :param journal_id: Journal ID to extract permissions from.
     """
-    actions.ensure_journal_permission(
+    await actions.ensure_journal_permission(
         db_session,
         request.state.user_id,
         request.state.user_group_id_list,
@@ -243,7 +256,7 @@ async def get_journal_permissions(
     :param journal_id: Journal ID to extract permissions from.
     :param holder_ids: Filter our holders (user or group) by ID.
     """
-    actions.ensure_journal_permission(
+    await actions.ensure_journal_permission(
         db_session,
         request.state.user_id,
         request.state.user_group_id_list,
@@ -254,7 +267,9 @@ async def get_journal_permissions(
     permissions = await actions.get_journal_permissions(
         db_session,
         journal_id,
-        holder_ids.split(",") if holder_ids is not None else None,
+        list(set(filter(None, holder_ids.split(","))))
+        if holder_ids is not None
+        else None,
     )
 
     return JournalPermissionsResponse(journal_id=journal_id, permissions=permissions)
@@ -290,7 +305,7 @@ async def add_journal_scopes(
     if JournalEntryScopes.DELETE.value in create_request.permission_list:
         ensure_permissions_set.add(JournalEntryScopes.DELETE)
 
-    actions.ensure_journal_permission(
+    await actions.ensure_journal_permission(
         db_session,
         request.state.user_id,
         request.state.user_group_id_list,
@@ -358,7 +373,7 @@ async def delete_journal_scopes(
                 status_code=400,
                 detail="Only group owner/admin allowed to manage group in journal",
             )
-    actions.ensure_journal_permission(
+    await actions.ensure_journal_permission(
         db_session,
         request.state.user_id,
         request.state.user_group_id_list,
@@ -471,7 +486,7 @@ async def create_journal(
     return JournalResponse(
         id=journal.id,
         bugout_user_id=journal.bugout_user_id,
-        holder_ids={holder.holder_id for holder in journal.permissions},
+        holder_ids=journal.holders_ids,
         name=journal.name,
         created_at=journal.created_at,
         updated_at=journal.updated_at,
@@ -490,7 +505,7 @@ async def get_journal(
 
     :param journal_id: Journal ID to extract permissions from
     """
-    journal = actions.ensure_journal_permission(
+    journal = await actions.ensure_journal_permission(
         db_session,
         request.state.user_id,
         request.state.user_group_id_list,
@@ -501,7 +516,7 @@ async def get_journal(
     return JournalResponse(
         id=journal.id,
         bugout_user_id=journal.bugout_user_id,
-        holder_ids={holder.holder_id for holder in journal.permissions},
+        holder_ids=journal.holders_ids,
         name=journal.name,
         created_at=journal.created_at,
         updated_at=journal.updated_at,
@@ -522,7 +537,7 @@ async def update_journal(
     :param journal_id: Journal ID to extract permissions from
     :param update_request: Journal parameters
     """
-    actions.ensure_journal_permission(
+    await actions.ensure_journal_permission(
         db_session,
         request.state.user_id,
         request.state.user_group_id_list,
@@ -551,7 +566,7 @@ async def update_journal(
     return JournalResponse(
         id=journal.id,
         bugout_user_id=journal.bugout_user_id,
-        holder_ids={holder.holder_id for holder in journal.permissions},
+        holder_ids=journal.holders_ids,
         name=journal.name,
         created_at=journal.created_at,
         updated_at=journal.updated_at,
@@ -565,15 +580,16 @@ async def update_journal(
 )
 async def delete_journal(
     request: Request,
+    background_tasks: BackgroundTasks,
     journal_id: UUID = Path(...),
     db_session: Session = Depends(db.yield_connection_from_env),
-    es_client: Elasticsearch = Depends(es.yield_es_client_from_env),
+    es_client: AsyncElasticsearch = Depends(es.yield_async_es_client_from_env),
 ) -> JournalResponse:
     """
     Soft delete the journal with the given ID (assuming the journal was created by the authenticated
     user).
     """
-    actions.ensure_journal_permission(
+    await actions.ensure_journal_permission(
         db_session,
         request.state.user_id,
         request.state.user_group_id_list,
@@ -598,13 +614,18 @@ async def delete_journal(
         raise HTTPException(status_code=500)
 
     es_index = journal.search_index
-
-    search.delete_journal_entries(es_client, es_index=es_index, journal_id=journal_id)
+    if es_index is not None:
+        background_tasks.add_task(
+            search.delete_journal_entries,
+            es_client,
+            es_index=es_index,
+            journal_id=journal_id,
+        )
 
     return JournalResponse(
         id=journal.id,
         bugout_user_id=journal.bugout_user_id,
-        holder_ids={holder.holder_id for holder in journal.permissions},
+        holder_ids=journal.holders_ids,
         name=journal.name,
         created_at=journal.created_at,
         updated_at=journal.updated_at,
@@ -622,7 +643,7 @@ async def update_journal_stats(
     Return journal statistics
     journal.read permission required.
     """
-    actions.ensure_journal_permission(
+    await actions.ensure_journal_permission(
         db_session,
         request.state.user_id,
         request.state.user_group_id_list,
@@ -667,7 +688,7 @@ async def generate_journal_stats(
     """
     Return journal statistics
     """
-    actions.ensure_journal_permission(
+    await actions.ensure_journal_permission(
         db_session,
         request.state.user_id,
         request.state.user_group_id_list,
@@ -798,10 +819,11 @@ async def generate_journal_stats(
 )
 async def create_journal_entry(
     request: Request,
+    background_tasks: BackgroundTasks,
     journal_id: UUID = Path(...),
     create_request: JournalEntryContent = Body(...),
     db_session: Session = Depends(db.yield_connection_from_env),
-    es_client: Elasticsearch = Depends(es.yield_es_client_from_env),
+    es_client: AsyncElasticsearch = Depends(es.yield_async_es_client_from_env),
 ) -> JournalEntryResponse:
     """
     Creates a journal entry
@@ -812,6 +834,7 @@ async def create_journal_entry(
         journal_id=journal_id,
         create_request=create_request,
         es_client=es_client,
+        background_tasks=background_tasks,
         representation=EntryRepresentationTypes.ENTRY,
     )
 
@@ -825,10 +848,11 @@ async def create_journal_entry(
 )
 async def create_journal_entity(
     request: Request,
+    background_tasks: BackgroundTasks,
     journal_id: UUID = Path(...),
     create_request: Entity = Body(...),
     db_session: Session = Depends(db.yield_connection_from_env),
-    es_client: Elasticsearch = Depends(es.yield_es_client_from_env),
+    es_client: AsyncElasticsearch = Depends(es.yield_async_es_client_from_env),
 ) -> EntityResponse:
     """
     Creates a journal entity.
@@ -839,6 +863,7 @@ async def create_journal_entity(
         journal_id=journal_id,
         create_request=create_request,
         es_client=es_client,
+        background_tasks=background_tasks,
         representation=EntryRepresentationTypes.ENTITY,
     )
 
@@ -857,10 +882,11 @@ async def create_journal_entity(
 )
 async def create_journal_entries_pack(
     request: Request,
+    background_tasks: BackgroundTasks,
     journal_id: UUID = Path(...),
     create_request: JournalEntryListContent = Body(...),
     db_session: Session = Depends(db.yield_connection_from_env),
-    es_client: Elasticsearch = Depends(es.yield_es_client_from_env),
+    es_client: AsyncElasticsearch = Depends(es.yield_async_es_client_from_env),
 ) -> ListJournalEntriesResponse:
     """
     Creates a pack of journal entries.
@@ -871,6 +897,7 @@ async def create_journal_entries_pack(
         journal_id=journal_id,
         create_request=create_request,
         es_client=es_client,
+        background_tasks=background_tasks,
         representation=EntryRepresentationTypes.ENTRY,
     )
 
@@ -884,11 +911,12 @@ async def create_journal_entries_pack(
 )
 async def create_journal_entities_pack(
     request: Request,
+    background_tasks: BackgroundTasks,
     journal_id: UUID = Path(...),
     create_request: EntityList = Body(...),
     db_session: Session = Depends(db.yield_connection_from_env),
-    es_client: Elasticsearch = Depends(es.yield_es_client_from_env),
-) -> EntitiesResponse:
+    es_client: AsyncElasticsearch = Depends(es.yield_async_es_client_from_env),
+) -> Union[EntitiesResponse, Response]:
     """
     Creates a pack of journal entities.
     """
@@ -898,6 +926,7 @@ async def create_journal_entities_pack(
         journal_id=journal_id,
         create_request=create_request,
         es_client=es_client,
+        background_tasks=background_tasks,
         representation=EntryRepresentationTypes.ENTITY,
     )
 
@@ -918,9 +947,12 @@ async def get_entries(
     context_url: Optional[str] = Query(None),
     limit: int = Query(10),
     offset: int = Query(0),
-) -> ListJournalEntriesResponse:
+    content: bool = Query(True),
+) -> Union[ListJournalEntriesResponse, Response]:
     """
     List all entries in a journal.
+
+    With content=false entries are returned without content.
     """
     result = await handlers.get_entries_handler(
         db_session=db_session,
@@ -932,6 +964,7 @@ async def get_entries(
         context_type=context_type,
         context_id=context_id,
         context_url=context_url,
+        content=content,
     )
 
     return result
@@ -951,9 +984,12 @@ async def get_entities(
     context_url: Optional[str] = Query(None),
     limit: int = Query(10),
     offset: int = Query(0),
-) -> EntitiesResponse:
+    content: bool = Query(True),
+) -> Union[EntitiesResponse, Response]:
     """
     List all entities in a journal.
+
+    With content=false entities are returned without content.
     """
     result = await handlers.get_entries_handler(
         db_session=db_session,
@@ -965,6 +1001,7 @@ async def get_entities(
         context_type=context_type,
         context_id=context_id,
         context_url=context_url,
+        content=content,
     )
 
     return result
@@ -1034,7 +1071,7 @@ async def get_entry_content(
     """
     Retrieves the text content of a journal entry
     """
-    actions.ensure_journal_permission(
+    await actions.ensure_journal_permission(
         db_session,
         request.state.user_id,
         request.state.user_group_id_list,
@@ -1086,12 +1123,13 @@ async def get_entry_content(
 )
 async def update_entry_content(
     request: Request,
+    background_tasks: BackgroundTasks,
     journal_id: UUID = Path(...),
     entry_id: UUID = Path(...),
     update_request: JournalEntryContent = Body(...),
     tags_action: EntryUpdateTagActions = Query(EntryUpdateTagActions.merge),
     db_session: Session = Depends(db.yield_connection_from_env),
-    es_client: Elasticsearch = Depends(es.yield_es_client_from_env),
+    es_client: AsyncElasticsearch = Depends(es.yield_async_es_client_from_env),
 ) -> JournalEntryContent:
     """
     Modifies the content of a journal entry through a simple override.
@@ -1104,6 +1142,7 @@ async def update_entry_content(
         entry_id=entry_id,
         update_request=update_request,
         es_client=es_client,
+        background_tasks=background_tasks,
         representation=EntryRepresentationTypes.ENTRY,
         tags_action=tags_action,
     )
@@ -1118,11 +1157,12 @@ async def update_entry_content(
 )
 async def update_entity_content(
     request: Request,
+    background_tasks: BackgroundTasks,
     journal_id: UUID = Path(...),
     entity_id: UUID = Path(...),
     update_request: Entity = Body(...),
     db_session: Session = Depends(db.yield_connection_from_env),
-    es_client: Elasticsearch = Depends(es.yield_es_client_from_env),
+    es_client: AsyncElasticsearch = Depends(es.yield_async_es_client_from_env),
 ) -> EntityResponse:
     """
     Modifies the content of a journal entity through a simple override.
@@ -1134,6 +1174,7 @@ async def update_entity_content(
         entry_id=entity_id,
         update_request=update_request,
         es_client=es_client,
+        background_tasks=background_tasks,
         representation=EntryRepresentationTypes.ENTITY,
         tags_action=EntryUpdateTagActions.replace,
     )
@@ -1156,7 +1197,7 @@ async def delete_entry_lock(
     Releases journal entry lock.
     Entry may be unlocked by other user.
     """
-    actions.ensure_journal_permission(
+    await actions.ensure_journal_permission(
         db_session,
         request.state.user_id,
         request.state.user_group_id_list,
@@ -1199,10 +1240,11 @@ async def delete_entry_lock(
 )
 async def delete_entry(
     request: Request,
+    background_tasks: BackgroundTasks,
     journal_id: UUID = Path(...),
     entry_id: UUID = Path(...),
     db_session: Session = Depends(db.yield_connection_from_env),
-    es_client: Elasticsearch = Depends(es.yield_es_client_from_env),
+    es_client: AsyncElasticsearch = Depends(es.yield_async_es_client_from_env),
 ) -> JournalEntryResponse:
     """
     Deletes journal entry.
@@ -1213,6 +1255,7 @@ async def delete_entry(
         journal_id=journal_id,
         entry_id=entry_id,
         es_client=es_client,
+        background_tasks=background_tasks,
         representation=EntryRepresentationTypes.ENTRY,
     )
 
@@ -1226,10 +1269,11 @@ async def delete_entry(
 )
 async def delete_entity(
     request: Request,
+    background_tasks: BackgroundTasks,
     journal_id: UUID = Path(...),
     entity_id: UUID = Path(...),
     db_session: Session = Depends(db.yield_connection_from_env),
-    es_client: Elasticsearch = Depends(es.yield_es_client_from_env),
+    es_client: AsyncElasticsearch = Depends(es.yield_async_es_client_from_env),
 ) -> EntityResponse:
     """
     Deletes journal entity.
@@ -1240,6 +1284,7 @@ async def delete_entity(
         journal_id=journal_id,
         entry_id=entity_id,
         es_client=es_client,
+        background_tasks=background_tasks,
         representation=EntryRepresentationTypes.ENTITY,
     )
 
@@ -1254,34 +1299,26 @@ async def delete_entries(
     entries_ids: JournalEntryIds,
     request: Request,
     db_session: Session = Depends(db.yield_connection_from_env),
-    es_client: Elasticsearch = Depends(es.yield_es_client_from_env),
+    es_client: AsyncElasticsearch = Depends(es.yield_async_es_client_from_env),
 ) -> ListJournalEntriesResponse:
     """
     Deletes a journal entries
     """
-    actions.ensure_journal_permission(
+    journal = await actions.ensure_journal_permission(
         db_session,
         request.state.user_id,
         request.state.user_group_id_list,
         journal_id,
         {JournalEntryScopes.DELETE},
     )
-    journal_spec = JournalSpec(id=journal_id, bugout_user_id=request.state.user_id)
-
-    try:
-        journal = await actions.find_journal(
-            db_session=db_session,
-            journal_spec=journal_spec,
-            user_group_id_list=request.state.user_group_id_list,
-        )
-    except actions.JournalNotFound:
+    if journal.deleted:
         logger.error(
             f"Journal not found with ID={journal_id} for user={request.state.user_id}"
         )
         raise HTTPException(status_code=404)
-    except Exception as e:
-        logger.error(f"Error retrieving journal: {str(e)}")
-        raise HTTPException(status_code=500)
+
+    journal_spec = JournalSpec(id=journal_id, bugout_user_id=request.state.user_id)
+
     es_index = journal.search_index
 
     try:
@@ -1307,7 +1344,7 @@ async def delete_entries(
 
     if es_index is not None:
         try:
-            search.bulk_delete_entries(
+            await search.bulk_delete_entries(
                 es_client,
                 es_index=es_index,
                 journal_id=str(journal_id),
@@ -1331,36 +1368,27 @@ async def delete_entries_by_search(
     income_search_query: DeletingQuery,
     request: Request,
     db_session: Session = Depends(db.yield_connection_from_env),
-    es_client: Elasticsearch = Depends(es.yield_es_client_from_env),
+    es_client: AsyncElasticsearch = Depends(es.yield_async_es_client_from_env),
 ) -> JournalEntriesBySearchDeletionResponse:
     """
     Deletes a journal entries
     """
-    actions.ensure_journal_permission(
+    journal = await actions.ensure_journal_permission(
         db_session,
         request.state.user_id,
         request.state.user_group_id_list,
         journal_id,
         {JournalEntryScopes.DELETE},
     )
-    journal_spec = JournalSpec(id=journal_id, bugout_user_id=request.state.user_id)
-
-    search_query = income_search_query.search_query
-
-    try:
-        journal = await actions.find_journal(
-            db_session=db_session,
-            journal_spec=journal_spec,
-            user_group_id_list=request.state.user_group_id_list,
-        )
-    except actions.JournalNotFound:
+    if journal.deleted:
         logger.error(
             f"Journal not found with ID={journal_id} for user={request.state.user_id}"
         )
         raise HTTPException(status_code=404)
-    except Exception as e:
-        logger.error(f"Error retrieving journal: {str(e)}")
-        raise HTTPException(status_code=500)
+
+    journal_spec = JournalSpec(id=journal_id, bugout_user_id=request.state.user_id)
+
+    search_query = income_search_query.search_query
 
     if journal.search_index is not None:
         raise HTTPException(status_code=403, detail="Not allowed for indexed journals.")
@@ -1423,34 +1451,23 @@ async def delete_entries_by_tags(
     tags_request: DeleteJournalEntriesByTagsAPIRequest,
     request: Request,
     db_session: Session = Depends(db.yield_connection_from_env),
-    es_client: Elasticsearch = Depends(es.yield_es_client_from_env),
+    es_client: AsyncElasticsearch = Depends(es.yield_async_es_client_from_env),
 ) -> JournalEntriesByTagsDeletionResponse:
     """
     Deletes a journal entries by tags list using AND condition
     """
-    actions.ensure_journal_permission(
+    journal = await actions.ensure_journal_permission(
         db_session,
         request.state.user_id,
         request.state.user_group_id_list,
         journal_id,
         {JournalEntryScopes.DELETE},
     )
-    journal_spec = JournalSpec(id=journal_id, bugout_user_id=request.state.user_id)
-
-    try:
-        journal = await actions.find_journal(
-            db_session=db_session,
-            journal_spec=journal_spec,
-            user_group_id_list=request.state.user_group_id_list,
-        )
-    except actions.JournalNotFound:
+    if journal.deleted:
         logger.error(
             f"Journal not found with ID={journal_id} for user={request.state.user_id}"
         )
         raise HTTPException(status_code=404)
-    except Exception as e:
-        logger.error(f"Error retrieving journal: {str(e)}")
-        raise HTTPException(status_code=500)
 
     es_index = journal.search_index
 
@@ -1475,7 +1492,7 @@ async def delete_entries_by_tags(
 
         if es_index is not None:
             try:
-                search.bulk_delete_entries(
+                await search.bulk_delete_entries(
                     es_client, es_index, journal.id, removed_entries_ids
                 )
             except Exception as e:
@@ -1500,7 +1517,7 @@ async def most_used_tags(
     Get all tags for a journal entry.
     """
 
-    actions.ensure_journal_permission(
+    await actions.ensure_journal_permission(
         db_session,
         request.state.user_id,
         request.state.user_group_id_list,
@@ -1535,35 +1552,27 @@ async def create_tags(
     entry_id: UUID,
     api_tag_request: CreateJournalEntryTagsAPIRequest,
     request: Request,
+    background_tasks: BackgroundTasks,
     db_session: Session = Depends(db.yield_connection_from_env),
-    es_client: Elasticsearch = Depends(es.yield_es_client_from_env),
+    es_client: AsyncElasticsearch = Depends(es.yield_async_es_client_from_env),
 ) -> List[str]:
     """
     Create tags for a journal entry.
     """
-    journal = actions.ensure_journal_permission(
+    journal = await actions.ensure_journal_permission(
         db_session,
         request.state.user_id,
         request.state.user_group_id_list,
         journal_id,
         {JournalEntryScopes.UPDATE},
     )
-
-    journal_spec = JournalSpec(id=journal_id, bugout_user_id=request.state.user_id)
-    try:
-        journal = await actions.find_journal(
-            db_session=db_session,
-            journal_spec=journal_spec,
-            user_group_id_list=request.state.user_group_id_list,
-        )
-    except actions.JournalNotFound:
+    if journal.deleted:
         logger.error(
             f"Journal not found with ID={journal_id} for user={request.state.user_id}"
         )
         raise HTTPException(status_code=404)
-    except Exception as e:
-        logger.error(f"Error retrieving journal: {str(e)}")
-        raise HTTPException(status_code=500)
+
+    journal_spec = JournalSpec(id=journal_id, bugout_user_id=request.state.user_id)
     es_index = journal.search_index
 
     tag_request = CreateJournalEntryTagRequest(
@@ -1593,35 +1602,33 @@ async def create_tags(
                 raise actions.EntryNotFound(
                     f"Entry not found with ID={entry_id} in journal with ID={journal_id}"
                 )
-            entry = journal_entry
             all_tags = await actions.get_journal_entry_tags(
                 db_session,
                 journal_spec,
                 entry_id,
                 user_group_id_list=request.state.user_group_id_list,
             )
-            all_tags_str = [tag.tag for tag in all_tags]
-            search.new_entry(
-                es_client,
-                es_index=es_index,
-                journal_id=entry.journal_id,
-                entry_id=entry.id,
-                title=entry.title,
-                content=entry.content,
-                tags=all_tags_str,
-                created_at=entry.created_at,
-                updated_at=entry.updated_at,
-                context_type=entry.context_type,
-                context_id=entry.context_id,
-                context_url=entry.context_url,
-            )
         except actions.EntryNotFound:
             raise HTTPException(status_code=404, detail="Entry not found")
         except Exception as e:
-            logger.warning(
-                f"Error creating tags for entry ({str(entry_id)}) in journal ({str(journal_id)}) "
-                f"for user ({request.state.user_id}): {repr(e)}"
-            )
+            logger.error(f"Error loading journal entry tags: {str(e)}")
+            raise HTTPException(status_code=500)
+
+        background_tasks.add_task(
+            search.new_entry,
+            es_client,
+            es_index=es_index,
+            journal_id=journal_entry.journal_id,
+            entry_id=journal_entry.id,
+            title=journal_entry.title,
+            content=journal_entry.content,
+            tags=[tag.tag for tag in all_tags],
+            created_at=journal_entry.created_at,
+            updated_at=journal_entry.updated_at,
+            context_type=journal_entry.context_type,
+            context_id=journal_entry.context_id,
+            context_url=journal_entry.context_url,
+        )
 
     return api_tag_request.tags
 
@@ -1640,7 +1647,7 @@ async def get_tags(
     """
     Get all tags for a journal entry.
     """
-    actions.ensure_journal_permission(
+    await actions.ensure_journal_permission(
         db_session,
         request.state.user_id,
         request.state.user_group_id_list,
@@ -1683,35 +1690,26 @@ async def update_tags(
     entry_id: UUID,
     api_tag_request: CreateJournalEntryTagsAPIRequest,
     request: Request,
+    background_tasks: BackgroundTasks,
     db_session: Session = Depends(db.yield_connection_from_env),
-    es_client: Elasticsearch = Depends(es.yield_es_client_from_env),
+    es_client: AsyncElasticsearch = Depends(es.yield_async_es_client_from_env),
 ) -> List[str]:
     """
     Update tags for a journal entry tags.
     """
-    actions.ensure_journal_permission(
+    journal = await actions.ensure_journal_permission(
         db_session,
         request.state.user_id,
         request.state.user_group_id_list,
         journal_id,
         {JournalEntryScopes.UPDATE},
     )
-
-    journal_spec = JournalSpec(id=journal_id, bugout_user_id=request.state.user_id)
-    try:
-        journal = await actions.find_journal(
-            db_session=db_session,
-            journal_spec=journal_spec,
-            user_group_id_list=request.state.user_group_id_list,
-        )
-    except actions.JournalNotFound:
+    if journal.deleted:
         logger.error(
             f"Journal not found with ID={journal_id} for user={request.state.user_id}"
         )
         raise HTTPException(status_code=404)
-    except Exception as e:
-        logger.error(f"Error retrieving journal: {str(e)}")
-        raise HTTPException(status_code=500)
+
     es_index = journal.search_index
 
     tag_request = CreateJournalEntryTagRequest(
@@ -1742,29 +1740,27 @@ async def update_tags(
                 raise actions.EntryNotFound(
                     f"Entry not found with ID={entry_id} in journal with ID={journal_id}"
                 )
-            entry = journal_entry
-            all_tags_str = [tag.tag for tag in tags]
-            search.new_entry(
-                es_client,
-                es_index=es_index,
-                journal_id=entry.journal_id,
-                entry_id=entry.id,
-                title=entry.title,
-                content=entry.content,
-                tags=all_tags_str,
-                created_at=entry.created_at,
-                updated_at=entry.updated_at,
-                context_type=entry.context_type,
-                context_id=entry.context_id,
-                context_url=entry.context_url,
-            )
         except actions.EntryNotFound:
             raise HTTPException(status_code=404, detail="Entry not found")
         except Exception as e:
-            logger.warning(
-                f"Error creating tags for entry ({str(entry_id)}) in journal ({str(journal_id)}) for "
-                f"user ({request.state.user_id}): {repr(e)}"
-            )
+            logger.error(f"Error loading journal entry: {str(e)}")
+            raise HTTPException(status_code=500)
+
+        background_tasks.add_task(
+            search.new_entry,
+            es_client,
+            es_index=es_index,
+            journal_id=journal_entry.journal_id,
+            entry_id=journal_entry.id,
+            title=journal_entry.title,
+            content=journal_entry.content,
+            tags=[tag.tag for tag in tags],
+            created_at=journal_entry.created_at,
+            updated_at=journal_entry.updated_at,
+            context_type=journal_entry.context_type,
+            context_id=journal_entry.context_id,
+            context_url=journal_entry.context_url,
+        )
 
     return api_tag_request.tags
 
@@ -1778,36 +1774,27 @@ async def create_entries_tags(
     journal_id: UUID,
     entries_tags_request: CreateEntriesTagsRequest,
     request: Request,
+    background_tasks: BackgroundTasks,
     db_session: Session = Depends(db.yield_connection_from_env),
-    es_client: Elasticsearch = Depends(es.yield_es_client_from_env),
+    es_client: AsyncElasticsearch = Depends(es.yield_async_es_client_from_env),
 ) -> List[JournalEntryResponse]:
     """
     Create tags for multiple journal entries.
     """
 
-    actions.ensure_journal_permission(
+    journal = await actions.ensure_journal_permission(
         db_session,
         request.state.user_id,
         request.state.user_group_id_list,
         journal_id,
         {JournalEntryScopes.UPDATE},
     )
-
-    journal_spec = JournalSpec(id=journal_id, bugout_user_id=request.state.user_id)
-    try:
-        journal = await actions.find_journal(
-            db_session=db_session,
-            journal_spec=journal_spec,
-            user_group_id_list=request.state.user_group_id_list,
-        )
-    except actions.JournalNotFound:
+    if journal.deleted:
         logger.error(
             f"Journal not found with ID={journal_id} for user={request.state.user_id}"
         )
         raise HTTPException(status_code=404)
-    except Exception as e:
-        logger.error(f"Error retrieving journal: {str(e)}")
-        raise HTTPException(status_code=500)
+
     es_index = journal.search_index
     try:
         updated_entry_ids = await actions.create_journal_entries_tags(
@@ -1836,19 +1823,13 @@ async def create_entries_tags(
         raise HTTPException(status_code=500)
 
     if es_index is not None:
-        try:
-            search.bulk_create_entries(
-                es_client,
-                es_index=es_index,
-                journal_id=journal_id,
-                entries=entries_objects,
-            )
-
-        except Exception as e:
-            logger.warning(
-                f"Error creating tags for entry ({updated_entry_ids}) in journal ({str(journal_id)}) for "
-                f"user ({request.state.user_id}): {repr(e)}"
-            )
+        background_tasks.add_task(
+            search.bulk_create_entries,
+            es_client,
+            es_index=es_index,
+            journal_id=journal_id,
+            entries=entries_objects,
+        )
 
     return entries_objects
 
@@ -1862,36 +1843,27 @@ async def delete_entries_tags(
     journal_id: UUID,
     entries_tags_request: CreateEntriesTagsRequest,
     request: Request,
+    background_tasks: BackgroundTasks,
     db_session: Session = Depends(db.yield_connection_from_env),
-    es_client: Elasticsearch = Depends(es.yield_es_client_from_env),
+    es_client: AsyncElasticsearch = Depends(es.yield_async_es_client_from_env),
 ) -> List[JournalEntryResponse]:
     """
     Delete tags for multiple journal entries.
     """
 
-    actions.ensure_journal_permission(
+    journal = await actions.ensure_journal_permission(
         db_session,
         request.state.user_id,
         request.state.user_group_id_list,
         journal_id,
         {JournalEntryScopes.UPDATE},
     )
-
-    journal_spec = JournalSpec(id=journal_id, bugout_user_id=request.state.user_id)
-    try:
-        journal = await actions.find_journal(
-            db_session=db_session,
-            journal_spec=journal_spec,
-            user_group_id_list=request.state.user_group_id_list,
-        )
-    except actions.JournalNotFound:
+    if journal.deleted:
         logger.error(
             f"Journal not found with ID={journal_id} for user={request.state.user_id}"
         )
         raise HTTPException(status_code=404)
-    except Exception as e:
-        logger.error(f"Error retrieving journal: {str(e)}")
-        raise HTTPException(status_code=500)
+
     es_index = journal.search_index
 
     try:
@@ -1917,19 +1889,13 @@ async def delete_entries_tags(
     )
 
     if es_index is not None:
-        try:
-            search.bulk_create_entries(
-                es_client,
-                es_index=es_index,
-                journal_id=journal_id,
-                entries=entries_objects,
-            )
-
-        except Exception as e:
-            logger.warning(
-                f"Error creating tags for entry ({deleted_entry_ids}) in journal ({str(journal_id)}) for "
-                f"user ({request.state.user_id}): {repr(e)}"
-            )
+        background_tasks.add_task(
+            search.bulk_create_entries,
+            es_client,
+            es_index=es_index,
+            journal_id=journal_id,
+            entries=entries_objects,
+        )
 
     return entries_objects
 
@@ -1944,37 +1910,29 @@ async def delete_tag(
     entry_id: UUID,
     api_request: DeleteJournalEntryTagAPIRequest,
     request: Request,
+    background_tasks: BackgroundTasks,
     db_session: Session = Depends(db.yield_connection_from_env),
-    es_client: Elasticsearch = Depends(es.yield_es_client_from_env),
+    es_client: AsyncElasticsearch = Depends(es.yield_async_es_client_from_env),
 ) -> JournalEntryTagsResponse:
     """
     Delete a tag on a journal entry.
 
     journal.read permission required.
     """
-    actions.ensure_journal_permission(
+    journal = await actions.ensure_journal_permission(
         db_session,
         request.state.user_id,
         request.state.user_group_id_list,
         journal_id,
         {JournalEntryScopes.UPDATE},
     )
-
-    journal_spec = JournalSpec(id=journal_id, bugout_user_id=request.state.user_id)
-    try:
-        journal = await actions.find_journal(
-            db_session=db_session,
-            journal_spec=journal_spec,
-            user_group_id_list=request.state.user_group_id_list,
-        )
-    except actions.JournalNotFound:
+    if journal.deleted:
         logger.error(
             f"Journal not found with ID={journal_id} for user={request.state.user_id}"
         )
         raise HTTPException(status_code=404)
-    except Exception as e:
-        logger.error(f"Error retrieving journal: {str(e)}")
-        raise HTTPException(status_code=500)
+
+    journal_spec = JournalSpec(id=journal_id, bugout_user_id=request.state.user_id)
     es_index = journal.search_index
 
     try:
@@ -2008,35 +1966,33 @@ async def delete_tag(
                 raise actions.EntryNotFound(
                     f"Entry not found with ID={entry_id} in journal with ID={journal_id}"
                 )
-            entry = journal_entry
             all_tags = await actions.get_journal_entry_tags(
                 db_session,
                 journal_spec,
                 entry_id,
                 user_group_id_list=request.state.user_group_id_list,
             )
-            all_tags_str = [tag.tag for tag in all_tags]
-            search.new_entry(
-                es_client,
-                es_index=es_index,
-                journal_id=entry.journal_id,
-                entry_id=entry.id,
-                title=entry.title,
-                content=entry.content,
-                tags=all_tags_str,
-                created_at=entry.created_at,
-                updated_at=entry.updated_at,
-                context_type=entry.context_type,
-                context_id=entry.context_id,
-                context_url=entry.context_url,
-            )
         except actions.EntryNotFound:
             raise HTTPException(status_code=404, detail="Entry not found")
         except Exception as e:
-            logger.warning(
-                f"Error creating tags for entry ({str(entry_id)}) in journal ({str(journal_id)}) for"
-                f"user ({request.state.user_id}): {repr(e)}"
-            )
+            logger.error(f"Error loading journal entry tags: {str(e)}")
+            raise HTTPException(status_code=500)
+
+        background_tasks.add_task(
+            search.new_entry,
+            es_client,
+            es_index=es_index,
+            journal_id=journal_entry.journal_id,
+            entry_id=journal_entry.id,
+            title=journal_entry.title,
+            content=journal_entry.content,
+            tags=[tag.tag for tag in all_tags],
+            created_at=journal_entry.created_at,
+            updated_at=journal_entry.updated_at,
+            context_type=journal_entry.context_type,
+            context_id=journal_entry.context_id,
+            context_url=journal_entry.context_url,
+        )
 
     tags = []
     if tag is not None:
@@ -2057,47 +2013,51 @@ async def search_journal(
     filters: Optional[List[str]] = Query(None),
     limit: int = Query(10),
     offset: int = Query(0),
+    cursor: Optional[str] = Query(None),
     content: bool = Query(True),
+    content_preview: Optional[int] = Query(None, ge=0),
     order: search.ResultsOrder = Query(search.ResultsOrder.DESCENDING),
     db_session: Session = Depends(db.yield_connection_from_env),
-    es_client: Elasticsearch = Depends(es.yield_es_client_from_env),
+    es_client: AsyncElasticsearch = Depends(es.yield_async_es_client_from_env),
     representation: EntryRepresentationTypes = Query(EntryRepresentationTypes.ENTRY),
-) -> JournalSearchResultsResponse:
+) -> Union[JournalSearchResultsResponse, Response]:
     """
     Executes a search query against the given journal.
+
+    Responses carry ETag computed from response body, if it matches If-None-Match header
+    of request, 304 Not Modified is returned without body.
+
+    With content_preview set, content of every result is truncated to that many characters.
+
+    Passing cursor (empty for the first page) switches to cursor pagination: offset is ignored
+    and next_cursor of the response points to the next page instead of next_offset.
     """
-    actions.ensure_journal_permission(
+    journal = await actions.ensure_journal_permission(
         db_session,
         request.state.user_id,
         request.state.user_group_id_list,
         journal_id,
         {JournalEntryScopes.READ},
     )
-
-    journal_spec = JournalSpec(id=journal_id, bugout_user_id=request.state.user_id)
-    try:
-        journal = await actions.find_journal(
-            db_session=db_session,
-            journal_spec=journal_spec,
-            user_group_id_list=request.state.user_group_id_list,
-        )
-    except actions.JournalNotFound:
+    if journal.deleted:
         logger.error(
             f"Journal not found with ID={journal_id} for user={request.state.user_id}"
         )
         raise HTTPException(status_code=404)
-    except Exception as e:
-        logger.error(f"Error retrieving journal: {str(e)}")
-        raise HTTPException(status_code=500)
 
-    if filters is None:
-        filters = []
-    search_query = search.normalized_search_query(q, filters, strict_filter_mode=False)
+    search_query, normalized_filters = search.cached_normalized_search_query(
+        q, tuple(filters) if filters is not None else (), strict_filter_mode=False
+    )
+    filters = list(normalized_filters)
 
     url: str = str(request.url).rstrip("/")
-    journal_url = "/".join(url.split("/")[:-1])
+    journal_url = url.rsplit("/", 1)[0]
+    journal_id_str = str(journal.id)
+    entries_prefix = f"{journal_url}/{representation_entries_paths[representation]}/"
 
-    results: List[Any] = []
+    search_entry_parser = get_parsers(representation).search_entry
+    parsed_results: List[Any] = []
+    next_cursor: Optional[str] = None
 
     es_index = journal.search_index
     if es_index is None:
@@ -2107,84 +2067,98 @@ async def search_journal(
         max_score: Optional[float] = 1.0
 
         for entry in rows:
-            entry_url = ""
-            if representation == EntryRepresentationTypes.ENTRY:
-                entry_url = f"{journal_url}/entries/{str(entry.id)}"
-            elif representation == EntryRepresentationTypes.ENTITY:
-                entry_url = f"{journal_url}/entities/{str(entry.id)}"
-            content_url = f"{entry_url}/content"
-
-            result = await journal_representation_parsers[representation][
-                "search_entry"
-            ](
-                journal_id=str(journal.id),
-                entry_url=entry_url,
-                content_url=content_url,
-                title=entry.title,
-                tags=entry.tags,
-                created_at=str(entry.created_at),
-                updated_at=str(entry.updated_at),
-                score=1.0,
-                context_type=entry.context_type,
-                context_id=entry.context_id,
-                context_url=entry.context_url,
-                content=entry.content,
+            entry_url = entries_prefix + str(entry.id)
+            content_url = entry_url + "/content"
+
+            parsed_results.append(
+                search_entry_parser(
+                    journal_id=journal_id_str,
+                    entry_url=entry_url,
+                    content_url=content_url,
+                    title=entry.title,
+                    tags=entry.tags,
+                    created_at=str(entry.created_at),
+                    updated_at=str(entry.updated_at),
+                    score=1.0,
+                    context_type=entry.context_type,
+                    context_id=entry.context_id,
+                    context_url=entry.context_url,
+                    content=entry.content[:content_preview]
+                    if content_preview is not None
+                    else entry.content,
+                )
             )
-            results.append(result)
     else:
-        search_results = search.search(
-            es_client,
-            es_index=es_index,
-            journal_id=journal_id,
-            search_query=search_query,
-            size=limit,
-            start=offset,
-            order=order,
-        )
+        search_after: Optional[List[Any]] = None
+        if cursor:
+            try:
+                search_after = search.decode_search_cursor(cursor)
+            except search.InvalidSearchCursor as e:
+                logger.error(str(e))
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+
+        try:
+            search_results = await search.search(
+                es_client,
+                es_index=es_index,
+                journal_id=journal_id,
+                search_query=search_query,
+                size=limit,
+                start=offset,
+                order=order,
+                cursor=cursor is not None,
+                search_after=search_after,
+            )
+        except search.InvalidSearchCursor as e:
+            logger.error(str(e))
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        except RequestError as e:
+            # Elasticsearch rejects search_after values of types not matching the sort
+            if search_after is None:
+                raise
+            logger.error(f"Search cursor rejected by Elasticsearch: {str(e)}")
+            raise HTTPException(status_code=400, detail="Invalid cursor")
 
         total_results = search_results.get("total", {}).get("value", 0)
         max_score = search_results.get("max_score")
         if max_score is None:
             max_score = 0.0
 
-        for hit in search_results.get("hits", []):
-            entry_url = ""
-            if representation == EntryRepresentationTypes.ENTRY:
-                entry_url = f"{journal_url}/entries/{hit['_id']}"
-            elif representation == EntryRepresentationTypes.ENTITY:
-                entry_url = f"{journal_url}/entities/{hit['_id']}"
+        hits = search_results.get("hits", [])
+        if cursor is not None and hits and len(hits) == limit:
+            next_cursor = search.encode_search_cursor(hits[-1]["sort"])
 
-            content_url = f"{entry_url}/content"
+        for hit in hits:
+            entry_url = entries_prefix + hit["_id"]
+            content_url = entry_url + "/content"
             source = hit.get("_source", {})
-            source_tags: Union[str, List[str]] = source.get("tag", [])
-            tags = []
-            if source_tags == str(source_tags):
-                source_tags = cast(str, source_tags)
-                tags = [source_tags]
-            else:
-                source_tags = cast(List[str], source_tags)
-                tags = source_tags
-
-            result = await journal_representation_parsers[representation][
-                "search_entry"
-            ](
-                journal_id=str(journal.id),
-                entry_url=entry_url,
-                content_url=content_url,
-                title=source.get("title", ""),
-                tags=tags,
-                created_at=datetime.fromtimestamp(source.get("created_at")).isoformat(),
-                updated_at=datetime.fromtimestamp(source.get("updated_at")).isoformat(),
-                score=hit.get("_score"),
-                context_type=source.get("context_type"),
-                context_id=source.get("context_id"),
-                context_url=source.get("context_url"),
-                content=source.get("content", "") if content is True else None,
+            hit_content: Optional[str] = None
+            if content is True:
+                hit_content = source.get("content", "")
+                if hit_content and content_preview is not None:
+                    hit_content = hit_content[:content_preview]
+            source_tags = source.get("tag") or []
+            tags = [source_tags] if isinstance(source_tags, str) else source_tags
+
+            parsed_results.append(
+                search_entry_parser(
+                    journal_id=journal_id_str,
+                    entry_url=entry_url,
+                    content_url=content_url,
+                    title=source.get("title", ""),
+                    tags=tags,
+                    created_at=search.timestamp_to_iso(source.get("created_at")),
+                    updated_at=search.timestamp_to_iso(source.get("updated_at")),
+                    score=hit.get("_score"),
+                    context_type=source.get("context_type"),
+                    context_id=source.get("context_id"),
+                    context_url=source.get("context_url"),
+                    content=hit_content,
+                )
             )
-            results.append(result)
 
     next_offset: Optional[int] = None
-    if offset + limit < total_results:
+    if (cursor is None or es_index is None) and offset + limit < total_results:
         next_offset = offset + limit
 
     response = JournalSearchResultsResponse(
@@ -2192,15 +2166,27 @@ async def search_journal(
         offset=offset,
         next_offset=next_offset,
         max_score=max_score,
-        results=results,
+        results=parsed_results,
+        next_cursor=next_cursor,
     )
 
+    # Journal updated_at is not bumped by entry changes, so ETag is derived from
+    # the response body itself
+    body = orjson.dumps(response.dict(), default=orjson_default)
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and etag in [
+        tag.strip() for tag in if_none_match.split(",")
+    ]:
+        return Response(status_code=304, headers={"ETag": etag})
+
     bugout_client_id = actions.bugout_client_id_from_request(request)
+    user_id = request.state.user_id
     background_tasks.add_task(
         actions.store_search_results,
         search_url=url,
         journal_id=journal_id,
-        bugout_user_id=request.state.user_id,
+        bugout_user_id=user_id,
         bugout_client_id=bugout_client_id,
         q=q,
         filters=filters,
@@ -2209,4 +2195,4 @@ async def search_journal(
         response=response,
     )
 
-    return response
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
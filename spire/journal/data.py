@@ -4,7 +4,7 @@ Journal-related data structures
 import uuid
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional, Set, Union
+from typing import Any, Dict, List, Optional, Sequence, Set, Union
 
 from pydantic import BaseModel, Extra, Field, root_validator
 
@@ -133,7 +133,7 @@ class JournalEntryResponse(BaseModel):
     content_url: Optional[str] = None
     title: Optional[str] = None
     content: Optional[str] = None
-    tags: List[str] = Field(default_factory=list)
+    tags: Sequence[str] = ()
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     context_url: Optional[str] = None
@@ -224,7 +224,7 @@ class JournalSearchResult(BaseModel):
     content_url: str
     title: str
     content: Optional[str] = None
-    tags: List[str] = Field(default_factory=list)
+    tags: Sequence[str] = ()
     created_at: str
     updated_at: str
     score: float
@@ -315,9 +315,7 @@ class Entity(BaseModel, extra=Extra.allow):
     context_type: Optional[str] = None
     created_at: Optional[datetime] = None
 
-    required_fields: List[Dict[str, Union[str, bool, int, list]]] = Field(
-        default_factory=list
-    )
+    required_fields: List[Dict[str, Union[str, list]]] = Field(default_factory=list)
 
     extra: Dict[str, Any]
 
@@ -365,7 +363,7 @@ class JournalSearchResultAsEntity(BaseModel):
     title: str
     address: Optional[str] = None
     blockchain: Optional[str] = None
-    required_fields: List[Dict[str, Any]] = Field(default_factory=list)
+    required_fields: Sequence[Dict[str, Any]] = ()
     secondary_fields: Dict[str, Any] = Field(default_factory=dict)
     created_at: str
     updated_at: str
@@ -380,3 +378,4 @@ class JournalSearchResultsResponse(BaseModel):
     results: List[Union[JournalSearchResult, JournalSearchResultAsEntity]] = Field(
         default_factory=list
     )
+    next_cursor: Optional[str] = None
@@ -1,11 +1,13 @@
-import json
 import logging
 from datetime import datetime, timezone
-from typing import List, Optional, Union
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from uuid import UUID
 
-from elasticsearch import Elasticsearch
-from fastapi import HTTPException, Request
+import orjson
+from elasticsearch import AsyncElasticsearch
+from fastapi import BackgroundTasks, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from . import actions, search
@@ -13,7 +15,6 @@ from .data import (
     ContextSpec,
     CreateJournalEntryRequest,
     CreateJournalEntryTagRequest,
-    EntitiesResponse,
     Entity,
     EntityResponse,
     EntryRepresentationTypes,
@@ -25,11 +26,152 @@ from .data import (
     JournalSpec,
     ListJournalEntriesResponse,
 )
-from .models import JournalEntryTag
-from .representations import journal_representation_parsers, parse_entity_to_entry
+from .models import JournalEntry
+from .representations import (
+    SpireORJSONResponse,
+    get_parsers,
+    parse_entity_to_entry,
+)
 
 logger = logging.getLogger(__name__)
 
+_ENTRY_ATTRS = attrgetter(
+    "id",
+    "title",
+    "created_at",
+    "updated_at",
+    "context_url",
+    "context_type",
+    "context_id",
+)
+
+
+def _render_entry(
+    entry_parser: Callable,
+    entry: Any,
+    journal_id: Union[str, UUID],
+    url: str,
+    tags: List[str],
+    locked_by: Optional[str],
+) -> Union[JournalEntryResponse, EntityResponse]:
+    """
+    Renders journal entry model (or entry response) with given representation parser.
+    """
+    (
+        id_,
+        title,
+        created_at,
+        updated_at,
+        context_url,
+        context_type,
+        context_id,
+    ) = _ENTRY_ATTRS(entry)
+    return entry_parser(
+        id=id_,
+        journal_id=journal_id,
+        title=title,
+        content=entry.content,
+        url=url,
+        tags=tags,
+        created_at=created_at,
+        updated_at=updated_at,
+        context_url=context_url,
+        context_type=context_type,
+        context_id=context_id,
+        locked_by=locked_by,
+    )
+
+
+def _render_entries(
+    entry_parser: Callable,
+    entries: List[JournalEntry],
+    journal_id: UUID,
+    url: str,
+    include_content: bool = True,
+) -> List[Union[JournalEntryResponse, EntityResponse]]:
+    """
+    Renders journal entry models with loaded tags and locks in a single pass.
+    """
+    parsed_entries: List[Union[JournalEntryResponse, EntityResponse]] = []
+    append_parsed_entry = parsed_entries.append
+    for entry in entries:
+        (
+            id_,
+            title,
+            created_at,
+            updated_at,
+            context_url,
+            context_type,
+            context_id,
+        ) = _ENTRY_ATTRS(entry)
+        entry_lock = entry.entry_lock
+        append_parsed_entry(
+            entry_parser(
+                id=id_,
+                journal_id=journal_id,
+                title=title,
+                content=entry.content if include_content else None,
+                url=url,
+                tags=[tag.tag for tag in entry.tags],
+                created_at=created_at,
+                updated_at=updated_at,
+                context_url=context_url,
+                context_type=context_type,
+                context_id=context_id,
+                locked_by=None if entry_lock is None else entry_lock.locked_by,
+            )
+        )
+
+    return parsed_entries
+
+
+def _build_entry_creation_request(
+    create_request: JournalEntryContent, journal_spec: JournalSpec
+) -> Tuple[CreateJournalEntryRequest, List[str]]:
+    creation_request = CreateJournalEntryRequest(
+        journal_spec=journal_spec,
+        title=create_request.title,
+        content=create_request.content,
+        tags=create_request.tags,
+        context_type=create_request.context_type,
+        context_id=create_request.context_id,
+        context_url=create_request.context_url,
+    )
+
+    if create_request.created_at is not None:
+        created_at_utc = datetime.astimezone(create_request.created_at, tz=timezone.utc)
+        created_at = created_at_utc.replace(tzinfo=None)
+        creation_request.created_at = created_at
+
+    tags = create_request.tags if create_request.tags is not None else []
+    return creation_request, tags
+
+
+def _build_entity_creation_request(
+    create_request: Entity, journal_spec: JournalSpec
+) -> Tuple[CreateJournalEntryRequest, List[str]]:
+    title, tags, content = parse_entity_to_entry(
+        create_entity=create_request,
+    )
+    creation_request = CreateJournalEntryRequest(
+        journal_spec=journal_spec,
+        title=title,
+        content=orjson.dumps(content).decode(),
+        tags=tags,
+        context_type="entity",
+    )
+    return creation_request, tags
+
+
+# Builds journal entry creation request and its tags from request of given representation
+_CREATION_REQUEST_BUILDERS: Dict[
+    EntryRepresentationTypes,
+    Callable[[Any, JournalSpec], Tuple[CreateJournalEntryRequest, List[str]]],
+] = {
+    EntryRepresentationTypes.ENTRY: _build_entry_creation_request,
+    EntryRepresentationTypes.ENTITY: _build_entity_creation_request,
+}
+
 
 # create_journal_entry_handler operates for api endpoints:
 # - create_journal_entry
@@ -39,54 +181,28 @@ async def create_journal_entry_handler(
     request: Request,
     journal_id: UUID,
     create_request: Union[JournalEntryContent, Entity],
-    es_client: Elasticsearch,
+    es_client: AsyncElasticsearch,
+    background_tasks: BackgroundTasks,
     representation: EntryRepresentationTypes,
 ) -> Union[JournalEntryResponse, EntityResponse]:
-    journal = actions.ensure_journal_permission(
+    entry_parser = get_parsers(representation).entry
+    user_id = request.state.user_id
+    user_group_ids = request.state.user_group_id_list
+
+    journal = await actions.ensure_journal_permission(
         db_session,
-        request.state.user_id,
-        request.state.user_group_id_list,
+        user_id,
+        user_group_ids,
         journal_id,
         {JournalEntryScopes.CREATE},
     )
-    journal_spec = JournalSpec(id=journal_id, bugout_user_id=request.state.user_id)
-
-    tags: List[str]
-    if representation == EntryRepresentationTypes.ENTRY:
-        creation_request = CreateJournalEntryRequest(
-            journal_spec=journal_spec,
-            title=create_request.title,
-            content=create_request.content,
-            tags=create_request.tags,
-            context_type=create_request.context_type,
-            context_id=create_request.context_id,
-            context_url=create_request.context_url,
-        )
-
-        if create_request.created_at is not None:
-            created_at_utc = datetime.astimezone(
-                create_request.created_at, tz=timezone.utc
-            )
-            created_at = created_at_utc.replace(tzinfo=None)
-            creation_request.created_at = created_at
+    journal_spec = JournalSpec(id=journal_id, bugout_user_id=user_id)
 
-        tags = create_request.tags if create_request.tags is not None else []
-    elif representation == EntryRepresentationTypes.ENTITY:
-        title, tags, content = parse_entity_to_entry(
-            create_entity=create_request,
-        )
-        creation_request = CreateJournalEntryRequest(
-            journal_spec=journal_spec,
-            title=title,
-            content=json.dumps(content),
-            tags=tags,
-            context_type="entity",
-        )
-    else:
-        logger.error(
-            f"Unsupported {EntryRepresentationTypes.ENTRY.value} representation type"
-        )
+    build_creation_request = _CREATION_REQUEST_BUILDERS.get(representation)
+    if build_creation_request is None:
+        logger.error(f"Unsupported {representation.value} representation type")
         raise HTTPException(status_code=500)
+    creation_request, tags = build_creation_request(create_request, journal_spec)
 
     es_index = journal.search_index
     try:
@@ -94,51 +210,40 @@ async def create_journal_entry_handler(
             db_session=db_session,
             journal=journal,
             entry_request=creation_request,
-            locked_by=request.state.user_id,
+            locked_by=user_id,
         )
     except actions.JournalNotFound:
-        logger.error(
-            f"Journal not found with ID={journal_id} for user={request.state.user_id}"
-        )
-        raise HTTPException(status_code=404)
+        logger.error(f"Journal not found with ID={journal_id} for user={user_id}")
+        raise HTTPException(status_code=404) from None
     except Exception as e:
         logger.error(f"Error creating journal entry: {str(e)}")
-        raise HTTPException(status_code=500)
+        raise HTTPException(status_code=500) from None
 
     if es_index is not None:
-        try:
-            search.new_entry(
-                es_client,
-                es_index=es_index,
-                journal_id=journal_entry.journal_id,
-                entry_id=journal_entry.id,
-                title=journal_entry.title,
-                content=journal_entry.content,
-                tags=tags,
-                created_at=journal_entry.created_at,
-                updated_at=journal_entry.updated_at,
-                context_type=journal_entry.context_type,
-                context_id=journal_entry.context_id,
-                context_url=journal_entry.context_url,
-            )
-        except Exception as e:
-            logger.warning(
-                f"Error indexing journal entry ({journal_entry.id}) in journal "
-                f"({journal_entry.journal_id}) for user ({request.state.user_id})"
-            )
+        background_tasks.add_task(
+            search.new_entry,
+            es_client,
+            es_index=es_index,
+            journal_id=journal_entry.journal_id,
+            entry_id=journal_entry.id,
+            title=journal_entry.title,
+            content=journal_entry.content,
+            tags=tags,
+            created_at=journal_entry.created_at,
+            updated_at=journal_entry.updated_at,
+            context_type=journal_entry.context_type,
+            context_id=journal_entry.context_id,
+            context_url=journal_entry.context_url,
+        )
 
-    return await journal_representation_parsers[representation]["entry"](
-        id=journal_entry.id,
+    url: str = str(request.url).rstrip("/")
+
+    return _render_entry(
+        entry_parser,
+        journal_entry,
         journal_id=journal_entry.journal_id,
-        title=journal_entry.title,
-        content=journal_entry.content,
-        url=str(request.url).rstrip("/"),
+        url=url,
         tags=tags,
-        created_at=journal_entry.created_at,
-        updated_at=journal_entry.updated_at,
-        context_url=journal_entry.context_url,
-        context_type=journal_entry.context_type,
-        context_id=journal_entry.context_id,
         locked_by=entry_lock.locked_by,
     )
 
@@ -151,33 +256,26 @@ async def create_journal_entries_pack_handler(
     request: Request,
     journal_id: UUID,
     create_request: Union[JournalEntryListContent, Entity],
-    es_client: Elasticsearch,
+    es_client: AsyncElasticsearch,
+    background_tasks: BackgroundTasks,
     representation: EntryRepresentationTypes,
-) -> Union[ListJournalEntriesResponse, EntitiesResponse]:
-    actions.ensure_journal_permission(
+) -> Union[ListJournalEntriesResponse, SpireORJSONResponse]:
+    entry_parser, entries_parser, _ = get_parsers(representation)
+    user_id = request.state.user_id
+    user_group_ids = request.state.user_group_id_list
+
+    journal = await actions.ensure_journal_permission(
         db_session,
-        request.state.user_id,
-        request.state.user_group_id_list,
+        user_id,
+        user_group_ids,
         journal_id,
         {JournalEntryScopes.CREATE},
     )
-    journal_spec = JournalSpec(id=journal_id, bugout_user_id=request.state.user_id)
-
-    try:
-        journal = await actions.find_journal(
-            db_session=db_session,
-            journal_spec=journal_spec,
-            user_group_id_list=request.state.user_group_id_list,
-        )
-    except actions.JournalNotFound:
-        logger.error(
-            f"Journal not found with ID={journal_id} for user={request.state.user_id}"
-        )
+    if journal.deleted:
+        logger.error(f"Journal not found with ID={journal_id} for user={user_id}")
         raise HTTPException(status_code=404)
-    except Exception as e:
-        logger.error(f"Error retrieving journal: {str(e)}")
-        raise HTTPException(status_code=500)
 
+    es_index = journal.search_index
     try:
         entries_response = await actions.create_journal_entries_pack(
             db_session,
@@ -185,41 +283,38 @@ async def create_journal_entries_pack_handler(
             create_request,
         )
     except actions.JournalNotFound:
-        logger.error(
-            f"Journal not found with ID={journal_id} for user={request.state.user_id}"
-        )
-        raise HTTPException(status_code=404)
+        logger.error(f"Journal not found with ID={journal_id} for user={user_id}")
+        raise HTTPException(status_code=404) from None
     except Exception as e:
         logger.error(f"Error creating journal entry: {str(e)}")
-        raise HTTPException(status_code=500)
+        raise HTTPException(status_code=500) from None
+
+    # Return connection to the pool before indexing and rendering of the pack
+    await run_in_threadpool(db_session.close)
 
-    es_index = journal.search_index
     if es_index is not None:
-        search.bulk_create_entries(
-            es_client, es_index, journal_id, entries_response.entries
+        background_tasks.add_task(
+            search.bulk_create_entries,
+            es_client,
+            es_index=es_index,
+            journal_id=journal_id,
+            entries=entries_response.entries,
         )
 
     if representation != EntryRepresentationTypes.ENTRY:
-        parsed_entries = []
-        for e in entries_response.entries:
-            obj = await journal_representation_parsers[representation]["entry"](
-                id=e.id,
+        url: str = str(request.url).rstrip("/")
+        parsed_entries = [
+            _render_entry(
+                entry_parser,
+                e,
                 journal_id=journal_id,
-                title=e.title,
-                content=e.content,
-                url=str(request.url).rstrip("/"),
+                url=url,
                 tags=e.tags,
-                created_at=e.created_at,
-                updated_at=e.updated_at,
-                context_url=e.context_url,
-                context_type=e.context_type,
-                context_id=e.context_id,
                 locked_by=e.locked_by,
             )
-            parsed_entries.append(obj)
-        return await journal_representation_parsers[representation]["entries"](
-            parsed_entries
-        )
+            for e in entries_response.entries
+        ]
+        return entries_parser(parsed_entries)
     else:
         return entries_response
 
@@ -237,16 +332,21 @@ async def get_entries_handler(
     context_type: Optional[str] = None,
     context_id: Optional[str] = None,
     context_url: Optional[str] = None,
-) -> Union[ListJournalEntriesResponse, EntitiesResponse]:
-    actions.ensure_journal_permission(
+    content: bool = True,
+) -> SpireORJSONResponse:
+    entry_parser, entries_parser, _ = get_parsers(representation)
+    user_id = request.state.user_id
+    user_group_ids = request.state.user_group_id_list
+
+    await actions.ensure_journal_permission(
         db_session,
-        request.state.user_id,
-        request.state.user_group_id_list,
+        user_id,
+        user_group_ids,
         journal_id,
         {JournalEntryScopes.READ},
     )
 
-    journal_spec = JournalSpec(id=journal_id, bugout_user_id=request.state.user_id)
+    journal_spec = JournalSpec(id=journal_id, bugout_user_id=user_id)
     context_spec = ContextSpec(
         context_type=context_type, context_id=context_id, context_url=context_url
     )
@@ -255,50 +355,29 @@ async def get_entries_handler(
             db_session,
             journal_spec,
             None,
-            user_group_id_list=request.state.user_group_id_list,
+            user_group_id_list=user_group_ids,
             context_spec=context_spec,
             limit=limit,
             offset=offset,
+            include_content=content,
         )
     except actions.JournalNotFound:
-        logger.error(
-            f"Journal not found with ID={journal_id} for user={request.state.user_id}"
-        )
-        raise HTTPException(status_code=404)
+        logger.error(f"Journal not found with ID={journal_id} for user={user_id}")
+        raise HTTPException(status_code=404) from None
     except Exception as e:
         logger.error(f"Error listing journal entries: {str(e)}")
-        raise HTTPException(status_code=500)
-
-    parsed_entries = []
+        raise HTTPException(status_code=500) from None
 
-    for e in entries:
-        tag_objects = await actions.get_journal_entry_tags(
-            db_session,
-            journal_spec,
-            e.id,
-            user_group_id_list=request.state.user_group_id_list,
-        )
-
-        obj = await journal_representation_parsers[representation]["entry"](
-            id=e.id,
-            journal_id=journal_id,
-            title=e.title,
-            content=e.content,
-            url=str(request.url).rstrip("/"),
-            tags=[tag.tag for tag in tag_objects],
-            created_at=e.created_at,
-            updated_at=e.updated_at,
-            context_url=e.context_url,
-            context_type=e.context_type,
-            context_id=e.context_id,
-            locked_by=None,
-        )
-        parsed_entries.append(obj)
+    # Entries are loaded, return connection to the pool before rendering
+    await run_in_threadpool(db_session.close)
 
-    return await journal_representation_parsers[representation]["entries"](
-        parsed_entries
+    url: str = str(request.url).rstrip("/")
+    parsed_entries = _render_entries(
+        entry_parser, entries, journal_id=journal_id, url=url, include_content=content
     )
 
+    return entries_parser(parsed_entries)
+
 
 # get_entry_handler operates for api endpoints:
 # - get_entry
@@ -310,10 +389,14 @@ async def get_entry_handler(
     entry_id: UUID,
     representation: EntryRepresentationTypes,
 ) -> Union[JournalEntryResponse, EntityResponse]:
-    actions.ensure_journal_permission(
+    entry_parser = get_parsers(representation).entry
+    user_id = request.state.user_id
+    user_group_ids = request.state.user_group_id_list
+
+    await actions.ensure_journal_permission(
         db_session,
-        request.state.user_id,
-        request.state.user_group_id_list,
+        user_id,
+        user_group_ids,
         journal_id,
         {JournalEntryScopes.READ},
     )
@@ -330,25 +413,22 @@ async def get_entry_handler(
         logger.error(
             f"Entry not found with ID={entry_id} in journal with ID={journal_id}"
         )
-        raise HTTPException(status_code=404, detail="Entry not found")
+        raise HTTPException(status_code=404, detail="Entry not found") from None
     except Exception as e:
         logger.error(f"Error listing journal entries: {str(e)}")
-        raise HTTPException(status_code=500)
+        raise HTTPException(status_code=500) from None
+
+    # Entry is loaded, return connection to the pool before rendering
+    await run_in_threadpool(db_session.close)
 
     url: str = str(request.url).rstrip("/")
 
-    return await journal_representation_parsers[representation]["entry"](
-        id=journal_entry.id,
+    return _render_entry(
+        entry_parser,
+        journal_entry,
         journal_id=journal_id,
-        title=journal_entry.title,
-        content=journal_entry.content,
         url=url,
         tags=[tag.tag for tag in tag_objects],
-        created_at=journal_entry.created_at,
-        updated_at=journal_entry.updated_at,
-        context_url=journal_entry.context_url,
-        context_type=journal_entry.context_type,
-        context_id=journal_entry.context_id,
         locked_by=None if entry_lock is None else entry_lock.locked_by,
     )
 
@@ -364,14 +444,19 @@ async def update_entry_content_handler(
     journal_id: UUID,
     entry_id: UUID,
     update_request: Union[JournalEntryContent, Entity],
-    es_client: Elasticsearch,
+    es_client: AsyncElasticsearch,
+    background_tasks: BackgroundTasks,
     representation: EntryRepresentationTypes,
     tags_action: EntryUpdateTagActions = EntryUpdateTagActions.merge,
 ) -> Union[JournalEntryContent, EntityResponse]:
-    journal = actions.ensure_journal_permission(
+    entry_parser = get_parsers(representation).entry
+    user_id = request.state.user_id
+    user_group_ids = request.state.user_group_id_list
+
+    journal = await actions.ensure_journal_permission(
         db_session,
-        request.state.user_id,
-        request.state.user_group_id_list,
+        user_id,
+        user_group_ids,
         journal_id,
         {JournalEntryScopes.UPDATE},
     )
@@ -385,61 +470,59 @@ async def update_entry_content_handler(
         ) = await actions.get_journal_entry_with_tags(
             db_session=db_session, journal_entry_id=entry_id
         )
-        if journal_entry is None:
+        if journal_entry is None or journal_entry.journal_id != journal_id:
             raise actions.EntryNotFound(
                 f"Entry not found with ID={entry_id} in journal with ID={journal_id}"
             )
     except actions.EntryNotFound:
-        raise HTTPException(status_code=404, detail="Entry not found")
+        raise HTTPException(status_code=404, detail="Entry not found") from None
     except Exception as e:
         logger.error(f"Error listing journal entries: {str(e)}")
-        raise HTTPException(status_code=500)
+        raise HTTPException(status_code=500) from None
+
+    url: str = str(request.url).rstrip("/")
 
-    if entry_lock is not None and entry_lock.locked_by != request.state.user_id:
-        return await journal_representation_parsers[representation]["entry"](
-            id=journal_entry.id,
+    if entry_lock is not None and entry_lock.locked_by != user_id:
+        return _render_entry(
+            entry_parser,
+            journal_entry,
             journal_id=journal_id,
-            title=journal_entry.title,
-            content=journal_entry.content,
-            url=str(request.url).rstrip("/"),
+            url=url,
             tags=[tag.tag for tag in tag_objects],
-            created_at=journal_entry.created_at,
-            updated_at=journal_entry.updated_at,
-            context_url=journal_entry.context_url,
-            context_type=journal_entry.context_type,
-            context_id=journal_entry.context_id,
             locked_by=entry_lock.locked_by,
         )
 
-    title: str
-    content: str
-    tags: List[str]
-    if representation == EntryRepresentationTypes.ENTRY:
-        title = update_request.title
-        content = update_request.content
-        tags = update_request.tags
-    elif representation == EntryRepresentationTypes.ENTITY:
-        title, tags, content_raw = parse_entity_to_entry(
-            create_entity=update_request,
-        )
-        content = json.dumps(content_raw)
-    else:
+    build_update_request = _CREATION_REQUEST_BUILDERS.get(representation)
+    if build_update_request is None:
         raise HTTPException(status_code=500)
+    entry_update_request, tags = build_update_request(
+        update_request, JournalSpec(id=journal_id, bugout_user_id=user_id)
+    )
+    title = entry_update_request.title
+    content = entry_update_request.content
+
+    # Snapshot of indexed fields, search index is left untouched on no-op updates
+    existing_tags = [tag.tag for tag in tag_objects]
+    old_search_signature = (
+        journal_entry.title,
+        journal_entry.content,
+        tuple(sorted(existing_tags)),
+    )
 
     try:
         journal_entry, entry_lock = await actions.update_journal_entry(
             db_session=db_session,
             new_title=title,
             new_content=content,
-            locked_by=request.state.user_id,
+            locked_by=user_id,
             journal_entry=journal_entry,
             entry_lock=entry_lock,
         )
     except Exception as e:
         logger.error(f"Error updating journal entry: {str(e)}")
-        raise HTTPException(status_code=500)
+        raise HTTPException(status_code=500) from None
 
-    updated_tag_objects: List[JournalEntryTag] = []
+    updated_tags: List[str] = []
     try:
         if tags_action == EntryUpdateTagActions.replace:
             tag_request = CreateJournalEntryTagRequest(
@@ -451,60 +534,53 @@ async def update_entry_content_handler(
                 entry_id,
                 tag_request,
             )
+            updated_tags = [tag.tag for tag in updated_tag_objects]
         elif tags_action == EntryUpdateTagActions.merge:
-            tag_request = CreateJournalEntryTagRequest(
-                journal_entry_id=entry_id, tags=tags
-            )
-            new_tag_objects = await actions.create_journal_entry_tags(
+            existing_tags_set = set(existing_tags)
+            new_tags = await actions.bulk_insert_tags(
                 db_session,
-                journal,
-                tag_request,
+                entry_id,
+                [tag for tag in dict.fromkeys(tags) if tag not in existing_tags_set],
             )
-            updated_tag_objects = tag_objects + new_tag_objects
+            updated_tags = existing_tags + new_tags
     except actions.EntryNotFound:
         logger.error(
             f"Entry not found with ID={entry_id} in journal with ID={journal_id}"
         )
-        raise HTTPException(status_code=404, detail="Entry not found")
+        raise HTTPException(status_code=404, detail="Entry not found") from None
     except Exception as e:
         logger.error(f"Error listing journal entries: {str(e)}")
-        raise HTTPException(status_code=500)
+        raise HTTPException(status_code=500) from None
 
-    tags = [tag.tag for tag in updated_tag_objects]
-    if es_index is not None:
-        try:
-            search.new_entry(
-                es_client,
-                es_index=es_index,
-                journal_id=journal_entry.journal_id,
-                entry_id=journal_entry.id,
-                title=journal_entry.title,
-                content=journal_entry.content,
-                tags=tags,
-                created_at=journal_entry.created_at,
-                updated_at=journal_entry.updated_at,
-                context_type=journal_entry.context_type,
-                context_id=journal_entry.context_id,
-                context_url=journal_entry.context_url,
-            )
-        except Exception as e:
-            logger.warning(
-                f"Error indexing journal entry ({journal_entry.id}) in journal "
-                f"({journal_entry.journal_id}) for user ({request.state.user_id})"
-            )
+    tags = updated_tags
+    new_search_signature = (
+        journal_entry.title,
+        journal_entry.content,
+        tuple(sorted(tags)),
+    )
+    if es_index is not None and new_search_signature != old_search_signature:
+        background_tasks.add_task(
+            search.new_entry,
+            es_client,
+            es_index=es_index,
+            journal_id=journal_entry.journal_id,
+            entry_id=journal_entry.id,
+            title=journal_entry.title,
+            content=journal_entry.content,
+            tags=tags,
+            created_at=journal_entry.created_at,
+            updated_at=journal_entry.updated_at,
+            context_type=journal_entry.context_type,
+            context_id=journal_entry.context_id,
+            context_url=journal_entry.context_url,
+        )
 
-    return await journal_representation_parsers[representation]["entry"](
-        id=journal_entry.id,
+    return _render_entry(
+        entry_parser,
+        journal_entry,
         journal_id=journal_id,
-        title=journal_entry.title,
-        content=journal_entry.content,
-        url=str(request.url).rstrip("/"),
+        url=url,
         tags=tags,
-        created_at=journal_entry.created_at,
-        updated_at=journal_entry.updated_at,
-        context_url=journal_entry.context_url,
-        context_type=journal_entry.context_type,
-        context_id=journal_entry.context_id,
         locked_by=entry_lock.locked_by,
     )
 
@@ -517,13 +593,18 @@ async def delete_entry_handler(
     request: Request,
     journal_id: UUID,
     entry_id: UUID,
-    es_client: Elasticsearch,
+    es_client: AsyncElasticsearch,
+    background_tasks: BackgroundTasks,
     representation: EntryRepresentationTypes,
 ) -> Union[JournalEntryResponse, EntityResponse]:
-    journal = actions.ensure_journal_permission(
+    entry_parser = get_parsers(representation).entry
+    user_id = request.state.user_id
+    user_group_ids = request.state.user_group_id_list
+
+    journal = await actions.ensure_journal_permission(
         db_session,
-        request.state.user_id,
-        request.state.user_group_id_list,
+        user_id,
+        user_group_ids,
         journal_id,
         {JournalEntryScopes.DELETE},
     )
@@ -535,45 +616,34 @@ async def delete_entry_handler(
             entry_id,
         )
     except actions.JournalNotFound:
-        logger.error(
-            f"Journal not found with ID={journal_id} for user={request.state.user_id}"
-        )
-        raise HTTPException(status_code=404, detail="Journal not found")
+        logger.error(f"Journal not found with ID={journal_id} for user={user_id}")
+        raise HTTPException(status_code=404, detail="Journal not found") from None
     except actions.EntryNotFound:
         logger.error(
             f"Entry not found with ID={entry_id} in journal with ID={journal_id}"
         )
-        raise HTTPException(status_code=404, detail="Entry not found")
+        raise HTTPException(status_code=404, detail="Entry not found") from None
     except Exception as e:
         logger.error(f"Error listing journal entries: {str(e)}")
-        raise HTTPException(status_code=500)
+        raise HTTPException(status_code=500) from None
 
     es_index = journal.search_index
     if es_index is not None:
-        try:
-            search.delete_entry(
-                es_client,
-                es_index=es_index,
-                journal_id=journal_entry.journal_id,
-                entry_id=journal_entry.id,
-            )
-        except Exception as e:
-            logger.warning(
-                f"Error deindexing entry ({journal_entry.id}) from index for journal "
-                f"({journal_entry.journal_id}) for user ({request.state.user_id})"
-            )
+        background_tasks.add_task(
+            search.delete_entry,
+            es_client,
+            es_index=es_index,
+            journal_id=journal_entry.journal_id,
+            entry_id=journal_entry.id,
+        )
+
+    url: str = str(request.url).rstrip("/")
 
-    return await journal_representation_parsers[representation]["entry"](
-        id=journal_entry.id,
+    return _render_entry(
+        entry_parser,
+        journal_entry,
         journal_id=journal_entry.journal_id,
-        title=journal_entry.title,
-        content=journal_entry.content,
-        url=str(request.url).rstrip("/"),
+        url=url,
         tags=[],
-        created_at=journal_entry.created_at,
-        updated_at=journal_entry.updated_at,
-        context_url=journal_entry.context_url,
-        context_type=journal_entry.context_type,
-        context_id=journal_entry.context_id,
         locked_by=None,
     )
@@ -3,6 +3,7 @@ SQLAlchemy models for journal-related tables.
 """
 import uuid
 from enum import Enum, unique
+from typing import FrozenSet
 
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import (
@@ -11,6 +12,7 @@ from sqlalchemy import (
     DateTime,
     Enum as PgEnum,
     ForeignKey,
+    Index,
     Integer,
     String,
     UniqueConstraint,
@@ -80,6 +82,14 @@ class Journal(Base):  # type: ignore
 
     __mapper_args__ = {"version_id_col": version_id}
 
+    @property
+    def holders_ids(self) -> FrozenSet[str]:
+        """
+        Ids of users and groups holding permissions on the journal. Same name as the aggregated
+        column of journals list query, so both can be used interchangeably in responses.
+        """
+        return frozenset(permission.holder_id for permission in self.permissions)
+
 
 class JournalEntry(Base):  # type: ignore
     __tablename__ = "journal_entries"
@@ -119,7 +129,23 @@ class JournalEntry(Base):  # type: ignore
     tags = relationship(
         "JournalEntryTag", cascade="all, delete, delete-orphan", lazy=True
     )
+    entry_lock = relationship(
+        "JournalEntryLock",
+        cascade="all, delete, delete-orphan",
+        passive_deletes=True,
+        uselist=False,
+        lazy=True,
+    )
 
+    __table_args__ = (
+        Index("ix_journal_entries_journal_id_created_at", "journal_id", "created_at"),
+        Index(
+            "ix_journal_entries_journal_id_context_type_context_id",
+            "journal_id",
+            "context_type",
+            "context_id",
+        ),
+    )
     __mapper_args__ = {"version_id_col": version_id}
 
 
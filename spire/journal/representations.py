@@ -2,53 +2,75 @@
 Manual journal parser depends on representations.
 
 Avoided pydantic modifications to save unique cases support, FastAPI response_model compatibility.
+Responses are built with construct() from already validated data, without second validation.
 """
 
-import json
+import inspect
 import logging
+import re
 from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple, cast
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple, cast
 from uuid import UUID
 
-from web3 import Web3
+import orjson
+from eth_hash.auto import keccak
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
 
 from .data import (
-    EntitiesResponse,
     Entity,
     EntityResponse,
     EntryRepresentationTypes,
     JournalEntryResponse,
     JournalSearchResult,
     JournalSearchResultAsEntity,
-    ListJournalEntriesResponse,
 )
 
 logger = logging.getLogger(__name__)
 
 
-# enforce_same_args is a decorator to make sure parser functions have similar arguments
-# TODO(kompotkot): Write factory function to generate signatures for paris of functions
-def enforce_same_args(func: Callable):
-    required_args = func.__code__.co_varnames[: func.__code__.co_argcount]
+def orjson_default(obj: Any) -> Any:
+    """
+    Converts types orjson does not serialize natively. UUID and datetime are handled
+    by orjson itself.
+    """
+    if isinstance(obj, BaseModel):
+        return obj.dict()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class SpireORJSONResponse(ORJSONResponse):
+    """
+    ORJSONResponse which also renders pydantic models, decimals and sets in the same orjson
+    call instead of failing on them.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content, option=orjson.OPT_NON_STR_KEYS, default=orjson_default
+        )
 
-    def wrapper(*args, **kwargs):
-        arg_names = list(required_args)
-        for arg in args:
-            try:
-                arg_names.remove(arg)
-            except ValueError:
-                raise ValueError(f"Unexpected argument: {arg}")
-        for kwarg in kwargs.keys():
-            try:
-                arg_names.remove(kwarg)
-            except ValueError:
-                raise ValueError(f"Unexpected argument: {kwarg}")
-        if arg_names:
-            raise ValueError(f"Missing arguments: {arg_names}")
 
-        return func(*args, **kwargs)
+# enforce_same_args makes sure parser functions of different representations have similar
+# arguments, it runs once at import instead of checking arguments on every parser call
+def enforce_same_args(*funcs: Callable) -> None:
+    expected_args = list(inspect.signature(funcs[0]).parameters)
+    for func in funcs[1:]:
+        args = list(inspect.signature(func).parameters)
+        if args != expected_args:
+            raise ValueError(
+                f"Unexpected arguments of {func.__name__}: {args}, expected: {expected_args}"
+            )
 
-    return wrapper
+
+# Entity fields stored in entry tags, other tags are entity required fields
+_ENTITY_TAG_FIELDS = frozenset(["address", "blockchain"])
 
 
 def parse_entry_tags_to_entity_fields(
@@ -57,23 +79,56 @@ def parse_entry_tags_to_entity_fields(
     """
     Convert Bugout entry to entity response.
     """
-    address: Optional[str] = None
-    blockchain: Optional[str] = None
-    required_fields: List[Dict[str, Any]] = []
-
-    for tag in tags:
-        if tag.startswith("address:"):
-            address = tag[len("address:") :]
-            continue
-        elif tag.startswith("blockchain:"):
-            blockchain = tag[len("blockchain:") :]
-            continue
-        field_and_val = tag.split(":")
-        required_fields.append(
-            {"".join(field_and_val[:1]): ":".join(field_and_val[1:])}
-        )
+    # Tag without separator becomes required field with empty value
+    split_tags = [tag.partition(":") for tag in tags]
+    entity_fields: Dict[str, str] = {
+        field: val
+        for field, separator, val in split_tags
+        if separator and field in _ENTITY_TAG_FIELDS
+    }
+    required_fields: List[Dict[str, Any]] = [
+        {field: val}
+        for field, separator, val in split_tags
+        if not separator or field not in _ENTITY_TAG_FIELDS
+    ]
+
+    return (
+        entity_fields.get("address"),
+        entity_fields.get("blockchain"),
+        required_fields,
+    )
+
+
+ADDRESS_HEX_RE = re.compile(r"[0-9a-f]{40}")
 
-    return address, blockchain, required_fields
+
+@lru_cache(maxsize=4096)
+def to_checksum_address(address: str) -> str:
+    """
+    Converts hex address to EIP-55 checksum address, same as Web3.toChecksumAddress.
+    Raises ValueError if address is not a 20 bytes hex string.
+    """
+    address_hex = address.lower()
+    if address_hex.startswith("0x"):
+        address_hex = address_hex[2:]
+    if ADDRESS_HEX_RE.fullmatch(address_hex) is None:
+        raise ValueError(f"Invalid address: {address}")
+
+    address_hash = keccak(address_hex.encode()).hex()
+    return "0x" + "".join(
+        char.upper() if int(hash_char, 16) >= 8 else char
+        for char, hash_char in zip(address_hex, address_hash)
+    )
+
+
+def _too_long_field(key: str, value: Any) -> bool:
+    """
+    Checks if required field with long key has value too long to be stored as tag.
+    """
+    if len(str(value)) >= 128:
+        logger.warning(f"Too long key:value {key}:{value}")
+        return True
+    return False
 
 
 def parse_entity_to_entry(
@@ -85,35 +140,28 @@ def parse_entity_to_entry(
     tags: List[str] = []
     content: Dict[str, Any] = {}
 
+    append_tag = tags.append
     for field, vals in create_entity._iter():
         if field == "address":
             try:
-                address = Web3.toChecksumAddress(cast(str, vals))
+                address = to_checksum_address(cast(str, vals))
             except Exception:
                 logger.info(f"Unknown type of web3 address {vals}")
                 address = vals
-            tags.append(f"{field}:{address}")
+            append_tag(f"{field}:{address}")
 
         elif field == "blockchain":
-            tags.append(f"{field}:{vals}")
+            append_tag(f"{field}:{vals}")
 
         elif field == "required_fields":
-            required_fields = []
-            for val in vals:
-                for f, v in val.items():
-                    if isinstance(v, list):
-                        for vl in v:
-                            if len(f) >= 128 and len(vl) >= 128:
-                                logger.warn(f"Too long key:value {f}:{vl}")
-                                continue
-                            required_fields.append(f"{str(f)}:{str(vl)}")
-                    else:
-                        if len(f) >= 128 and len(vl) >= 128:
-                            logger.warn(f"Too long key:value {f}:{vl}")
-                            continue
-                        required_fields.append(f"{f}:{v}")
-
-            tags.extend(required_fields)
+            # List values produce tag per item, keys are rarely long enough to check values
+            tags.extend(
+                f"{f}:{v}"
+                for val in vals
+                for f, raw_v in val.items()
+                for v in (raw_v if isinstance(raw_v, list) else (raw_v,))
+                if len(f) < 128 or not _too_long_field(f, v)
+            )
 
         elif field == "extra":
             for k, v in vals.items():
@@ -123,14 +171,13 @@ def parse_entity_to_entry(
 
 
 # Entry parsers
-@enforce_same_args
-async def parse_entry_model(
+def parse_entry_model(
     id: UUID,
     journal_id: UUID,
     title: Optional[str] = None,
     content: Optional[str] = None,
     url: Optional[str] = None,
-    tags: List[str] = [],
+    tags: Optional[List[str]] = None,
     created_at: Optional[datetime] = None,
     updated_at: Optional[datetime] = None,
     context_url: Optional[str] = None,
@@ -138,13 +185,19 @@ async def parse_entry_model(
     context_id: Optional[str] = None,
     locked_by: Optional[str] = None,
 ) -> JournalEntryResponse:
-    return JournalEntryResponse(
+    journal_url: Optional[str] = None
+    content_url: Optional[str] = None
+    if url is not None:
+        journal_url = url.rsplit("/", 2)[0]
+        content_url = url + "/content"
+
+    return JournalEntryResponse.construct(
         id=id,
-        journal_url="/".join(url.split("/")[:-2]) if url is not None else None,
-        content_url=f"{url}/content" if url is not None else None,
+        journal_url=journal_url,
+        content_url=content_url,
         title=title,
         content=content,
-        tags=tags,
+        tags=tags if tags is not None else [],
         created_at=created_at,
         updated_at=updated_at,
         context_url=context_url,
@@ -154,20 +207,23 @@ async def parse_entry_model(
     )
 
 
-async def parse_entries_model(
+# Entries parsers return ready responses, so FastAPI does not encode and validate
+# every entry of the list against response model once again. Entries are built by
+# parsers with construct() and have no nested models, so their field values are
+# rendered from __dict__ as is, without copying every entry with dict().
+def parse_entries_model(
     entries: List[JournalEntryResponse],
-) -> ListJournalEntriesResponse:
-    return ListJournalEntriesResponse(entries=entries)
+) -> SpireORJSONResponse:
+    return SpireORJSONResponse({"entries": [entry.__dict__ for entry in entries]})
 
 
-@enforce_same_args
-async def parse_entry_model_as_entity(
+def parse_entry_model_as_entity(
     id: UUID,
     journal_id: UUID,
     title: Optional[str] = None,
     content: Optional[str] = None,
     url: Optional[str] = None,
-    tags: List[str] = [],
+    tags: Optional[List[str]] = None,
     created_at: Optional[datetime] = None,
     updated_at: Optional[datetime] = None,
     context_url: Optional[str] = None,
@@ -175,17 +231,19 @@ async def parse_entry_model_as_entity(
     context_id: Optional[str] = None,
     locked_by: Optional[str] = None,
 ) -> EntityResponse:
-    address, blockchain, required_fields = parse_entry_tags_to_entity_fields(tags=tags)
+    address, blockchain, required_fields = parse_entry_tags_to_entity_fields(
+        tags=tags if tags is not None else []
+    )
     secondary_fields = {}
     try:
-        secondary_fields = json.loads(content) if content is not None else {}
+        secondary_fields = orjson.loads(content) if content else {}
     except Exception:
         secondary_fields = {"JSONDecodeError": "unable to parse as JSON"}
 
-    return EntityResponse(
+    return EntityResponse.construct(
         id=id,
         journal_id=journal_id,
-        journal_url="/".join(url.split("/")[:-2]) if url is not None else None,
+        journal_url=url.rsplit("/", 2)[0] if url is not None else None,
         address=address,
         blockchain=blockchain,
         title=title,
@@ -197,14 +255,14 @@ async def parse_entry_model_as_entity(
     )
 
 
-async def parse_entries_model_as_entity(
+def parse_entries_model_as_entity(
     entries: List[EntityResponse],
-) -> EntitiesResponse:
-    return EntitiesResponse(entities=entries)
+) -> SpireORJSONResponse:
+    return SpireORJSONResponse({"entities": [entry.__dict__ for entry in entries]})
 
 
 # Search entry parsers
-async def parse_search_entry_model(
+def parse_search_entry_model(
     journal_id: str,
     entry_url: str,
     content_url: str,
@@ -218,7 +276,7 @@ async def parse_search_entry_model(
     context_url: Optional[str] = None,
     content: Optional[str] = None,
 ) -> JournalSearchResult:
-    return JournalSearchResult(
+    return JournalSearchResult.construct(
         entry_url=entry_url,
         content_url=content_url,
         title=title,
@@ -233,7 +291,7 @@ async def parse_search_entry_model(
     )
 
 
-async def parse_search_entry_model_as_entity(
+def parse_search_entry_model_as_entity(
     journal_id: str,
     entry_url: str,
     content_url: str,
@@ -250,11 +308,11 @@ async def parse_search_entry_model_as_entity(
     address, blockchain, required_fields = parse_entry_tags_to_entity_fields(tags=tags)
     secondary_fields = {}
     try:
-        secondary_fields = json.loads(content) if content is not None else {}
+        secondary_fields = orjson.loads(content) if content else {}
     except Exception:
         secondary_fields = {"JSONDecodeError": "unable to parse as JSON"}
 
-    return JournalSearchResultAsEntity(
+    return JournalSearchResultAsEntity.construct(
         journal_id=journal_id,
         entity_url=entry_url,
         title=title,
@@ -268,15 +326,41 @@ async def parse_search_entry_model_as_entity(
     )
 
 
-journal_representation_parsers: Dict[EntryRepresentationTypes, Dict[str, Callable]] = {
-    EntryRepresentationTypes.ENTRY: {
-        "entry": parse_entry_model,
-        "entries": parse_entries_model,
-        "search_entry": parse_search_entry_model,
-    },
-    EntryRepresentationTypes.ENTITY: {
-        "entry": parse_entry_model_as_entity,
-        "entries": parse_entries_model_as_entity,
-        "search_entry": parse_search_entry_model_as_entity,
-    },
+enforce_same_args(parse_entry_model, parse_entry_model_as_entity)
+enforce_same_args(parse_search_entry_model, parse_search_entry_model_as_entity)
+
+
+# URL path of journal entries in given representation
+representation_entries_paths: Dict[EntryRepresentationTypes, str] = {
+    EntryRepresentationTypes.ENTRY: "entries",
+    EntryRepresentationTypes.ENTITY: "entities",
+}
+
+
+class RepresentationParsers(NamedTuple):
+    entry: Callable
+    entries: Callable
+    search_entry: Callable
+
+
+journal_representation_parsers: Dict[
+    EntryRepresentationTypes, RepresentationParsers
+] = {
+    EntryRepresentationTypes.ENTRY: RepresentationParsers(
+        entry=parse_entry_model,
+        entries=parse_entries_model,
+        search_entry=parse_search_entry_model,
+    ),
+    EntryRepresentationTypes.ENTITY: RepresentationParsers(
+        entry=parse_entry_model_as_entity,
+        entries=parse_entries_model_as_entity,
+        search_entry=parse_search_entry_model_as_entity,
+    ),
 }
+
+
+def get_parsers(representation: EntryRepresentationTypes) -> RepresentationParsers:
+    """
+    Returns (entry, entries, search_entry) parsers of given representation.
+    """
+    return journal_representation_parsers[representation]
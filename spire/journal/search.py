@@ -3,17 +3,31 @@ Journal search and search indices
 """
 import argparse
 import asyncio
+import base64
+import binascii
+import functools
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 import logging
-from typing import Any, Callable, Dict, Optional, List, Tuple, Union
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    Optional,
+    List,
+    Tuple,
+    Union,
+)
 from uuid import UUID
 
 from dateutil.parser import parse as parse_datetime  # type: ignore
 import elasticsearch
+import orjson
 from elasticsearch.client import IndicesClient
-from elasticsearch.helpers import bulk
+from elasticsearch.helpers import async_bulk, async_streaming_bulk, bulk
 from sqlalchemy import and_, or_, not_, func
 from sqlalchemy.sql.elements import BooleanClauseList
 from sqlalchemy.orm import Session, Query
@@ -22,9 +36,14 @@ from sqlalchemy.orm import Session, Query
 from . import actions
 from .data import JournalSpec, JournalEntryResponse
 from ..db import yield_connection_from_env
-from ..es import es_client_from_env
+from ..es import async_es_client_from_env, es_client_from_env
 from .models import Journal, JournalEntry, JournalEntryTag
-from ..utils.settings import DEFAULT_JOURNALS_ES_INDEX, BULK_CHUNKSIZE
+from ..utils.settings import (
+    BULK_CHUNKSIZE,
+    BULK_MAX_CHUNK_BYTES,
+    BULK_REQUEST_TIMEOUT,
+    DEFAULT_JOURNALS_ES_INDEX,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +54,35 @@ class IndexAlreadyExists(Exception):
     """
 
 
+class InvalidSearchCursor(ValueError):
+    """
+    Raised when a search cursor could not be decoded.
+    """
+
+
+def log_exceptions(
+    wrapped_func: Callable[..., Awaitable[Any]]
+) -> Callable[..., Awaitable[Any]]:
+    """
+    Wraps an indexing coroutine so that errors are logged instead of raised. Indexing runs in
+    background tasks after the response is sent, so there is nobody to propagate errors to.
+    Decorator.
+    """
+
+    @functools.wraps(wrapped_func)
+    async def decoration(*args, **kwargs):
+        try:
+            return await wrapped_func(*args, **kwargs)
+        except Exception as e:
+            logger.warning(
+                f"Error in {wrapped_func.__name__} for journal "
+                f"({kwargs.get('journal_id')}): {str(e)}"
+            )
+            return None
+
+    return decoration
+
+
 def _index(index: Union[str, UUID]) -> str:
     """
     Name of index for a single journal.
@@ -155,8 +203,9 @@ def create_index(
     return index_name
 
 
-def new_entry(
-    es_client: elasticsearch.Elasticsearch,
+@log_exceptions
+async def new_entry(
+    es_client: elasticsearch.AsyncElasticsearch,
     es_index: Union[str, UUID],
     journal_id: Union[str, UUID],
     entry_id: Union[str, UUID],
@@ -171,16 +220,12 @@ def new_entry(
 ) -> str:
     """
     Index a new entry in a journal. Returns the ID of the new document.
-    If an entry with that ID has already been indexed, deletes the previous entry and adds the new
-    one by default. If you wish to raise an error instead, set `force` to `False` (default is
-    `True`).
+    If an entry with that ID has already been indexed, the previous document is replaced by the
+    new one.
     """
     index_name = _index(es_index)
     entry_id_str = str(entry_id)
 
-    if es_client.exists(index_name, entry_id_str):
-        es_client.delete(index_name, entry_id_str)
-
     if created_at is None:
         created_at = datetime.utcnow()
     if updated_at is None:
@@ -196,57 +241,69 @@ def new_entry(
         "context_id": context_id,
         "context_url": context_url,
     }
-    es_client.create(index_name, entry_id_str, entry_body)
+    await es_client.index(index_name, entry_body, id=entry_id_str)
     return entry_id_str
 
 
-def bulk_create_entries(
-    es_client: elasticsearch.Elasticsearch,
+@log_exceptions
+async def bulk_create_entries(
+    es_client: elasticsearch.AsyncElasticsearch,
     es_index: Union[str, UUID],
     journal_id: Union[str, UUID],
     entries: List[JournalEntryResponse],
-) -> str:
+) -> int:
     """
-    Index a new entry in a journal. Returns the ID of the new document.
-    If an entry with that ID has already been indexed, deletes the previous entry and adds the new
-    one by default. If you wish to raise an error instead, set `force` to `False` (default is
-    `True`).
+    Index a pack of entries in a journal. Returns the number of indexed documents.
+    Documents are streamed to Elasticsearch in chunks, so the whole request body is never built
+    in memory. Entries which failed to index are logged and skipped.
     """
     index_name = _index(es_index)
+    journal_id_str = str(journal_id)
+    # Entries of a pack without timestamps share the same one
+    now_ts = datetime.utcnow().timestamp()
 
-    for entries_chunk in [
-        entries[i : i + BULK_CHUNKSIZE] for i in range(0, len(entries), BULK_CHUNKSIZE)
-    ]:
-        bulk_commands = [
-            {
+    def generate_bulk_commands() -> Iterator[Dict[str, Any]]:
+        for entry in entries:
+            yield {
                 "_index": index_name,
                 "_id": str(entry.id),
                 "_source": {
-                    "journal_id": str(journal_id),
+                    "journal_id": journal_id_str,
                     "title": entry.title,
                     "content": entry.content,
                     "tag": entry.tags,
                     "created_at": entry.created_at.timestamp()
                     if entry.created_at
-                    else datetime.utcnow().timestamp(),
+                    else now_ts,
                     "updated_at": entry.updated_at.timestamp()
                     if entry.updated_at
-                    else datetime.utcnow().timestamp(),
+                    else now_ts,
                     "context_type": entry.context_type,
                     "context_id": entry.context_id,
                     "context_url": entry.context_url,
                 },
             }
-            for entry in entries_chunk
-        ]
 
-        response = bulk(es_client, bulk_commands)
+    indexed = 0
+    async for ok, info in async_streaming_bulk(
+        es_client,
+        generate_bulk_commands(),
+        chunk_size=BULK_CHUNKSIZE,
+        max_chunk_bytes=BULK_MAX_CHUNK_BYTES,
+        raise_on_error=False,
+        request_timeout=BULK_REQUEST_TIMEOUT,
+    ):
+        if ok:
+            indexed += 1
+        else:
+            logger.warning(f"Error indexing entry in journal ({journal_id}): {info}")
 
-    return response
+    return indexed
 
 
-def delete_entry(
-    es_client: elasticsearch.Elasticsearch,
+@log_exceptions
+async def delete_entry(
+    es_client: elasticsearch.AsyncElasticsearch,
     es_index: Union[str, UUID],
     journal_id: Union[str, UUID],
     entry_id: Union[str, UUID],
@@ -257,14 +314,13 @@ def delete_entry(
     index_name = _index(es_index)
     entry_id_str = str(entry_id)
 
-    if es_client.exists(index_name, entry_id_str):
-        es_client.delete(index_name, entry_id_str)
+    await es_client.delete(index_name, entry_id_str, ignore=404)
 
     return entry_id_str
 
 
-def bulk_delete_entries(
-    es_client: elasticsearch.Elasticsearch,
+async def bulk_delete_entries(
+    es_client: elasticsearch.AsyncElasticsearch,
     es_index: str,
     journal_id: Union[str, UUID],
     entries_ids: List[UUID],
@@ -277,11 +333,19 @@ def bulk_delete_entries(
         {"_op_type": "delete", "_index": es_index, "_id": str(entry_id)}
         for entry_id in entries_ids
     ]
-    bulk(es_client, bulk_commands)
+    await async_bulk(es_client, bulk_commands)
 
 
-def delete_journal_entries(
-    es_client: elasticsearch.Elasticsearch,
+def journal_entries_query(journal_id: Union[str, UUID]) -> Dict[str, Any]:
+    """
+    Query matching all documents of a journal.
+    """
+    return {"query": {"terms": {"journal_id": [str(journal_id)]}}}
+
+
+@log_exceptions
+async def delete_journal_entries(
+    es_client: elasticsearch.AsyncElasticsearch,
     es_index: str,
     journal_id: Union[str, UUID],
 ) -> str:
@@ -291,8 +355,8 @@ def delete_journal_entries(
 
     index_name = _index(es_index)
 
-    es_client.delete_by_query(
-        index=index_name, body={"query": {"terms": {"journal_id": [str(journal_id)]}}}
+    await es_client.delete_by_query(
+        index=index_name, body=journal_entries_query(journal_id)
     )
 
     return str(journal_id)
@@ -309,7 +373,7 @@ def erase(
     Erases index for a given journal or for all journals.
     """
     if es_index is None:
-        logger.warn("Noop erasure for null index")
+        logger.warning("Noop erasure for null index")
         return
     if db_session is None:
         db_session = next(yield_connection_from_env())
@@ -319,7 +383,9 @@ def erase(
             index_name = _index(es_index)
 
             if journal_id != "any":
-                delete_journal_entries(es_client, index_name, journal_id)
+                es_client.delete_by_query(
+                    index=index_name, body=journal_entries_query(journal_id)
+                )
             else:
                 drop_index(es_client, index_name)
     finally:
@@ -339,7 +405,7 @@ def synchronize(
     This can be done for a single journal or for all journals.
     """
     if es_index is None:
-        logger.warn("Noop synchronization with null index")
+        logger.warning("Noop synchronization with null index")
         return
 
     if db_session is None:
@@ -772,18 +838,70 @@ def search_database(
     return num_entries, rows
 
 
-def search(
-    es_client: elasticsearch.Elasticsearch,
+@functools.lru_cache(maxsize=2048)
+def cached_normalized_search_query(
+    q: str, filters: Tuple[str, ...], strict_filter_mode: bool = True
+) -> Tuple[SearchQuery, Tuple[str, ...]]:
+    """
+    Memoized normalized_search_query for repeated queries (e.g. pagination over the same search).
+    Returns the search query together with resulting filters, including filters extracted from q.
+
+    Returned SearchQuery is shared between calls and must not be modified.
+    """
+    filters_list = list(filters)
+    search_query = normalized_search_query(
+        q, filters_list, strict_filter_mode=strict_filter_mode
+    )
+    return search_query, tuple(filters_list)
+
+
+@functools.lru_cache(maxsize=4096)
+def timestamp_to_iso(timestamp: float) -> str:
+    """
+    Converts epoch timestamp of indexed entry to ISO format. Memoized, entries created in bulk
+    share timestamps and created_at equals updated_at for entries which were never updated.
+    """
+    return datetime.fromtimestamp(timestamp).isoformat()
+
+
+def encode_search_cursor(sort_values: List[Any]) -> str:
+    """
+    Packs sort values of the last search hit into an opaque url-safe cursor.
+    """
+    return base64.urlsafe_b64encode(orjson.dumps(sort_values)).decode()
+
+
+def decode_search_cursor(cursor: str) -> List[Any]:
+    """
+    Unpacks cursor generated by encode_search_cursor into search_after values.
+    """
+    try:
+        sort_values = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError):
+        raise InvalidSearchCursor(f"Invalid search cursor: {cursor}")
+    if not isinstance(sort_values, list) or not sort_values:
+        raise InvalidSearchCursor(f"Invalid search cursor: {cursor}")
+    return sort_values
+
+
+async def search(
+    es_client: elasticsearch.AsyncElasticsearch,
     es_index: Union[str, UUID],
     journal_id: Union[str, UUID],
     search_query: SearchQuery,
     size: int = 10,
     start: int = 0,
     order: ResultsOrder = ResultsOrder.DESCENDING,
+    cursor: bool = False,
+    search_after: Optional[List[Any]] = None,
 ) -> Dict[str, Any]:
     """
     Execute a search against a journal index. Returns Elasticsearch hits object:
     https://www.elastic.co/guide/en/elasticsearch/reference/current/search-search.html#search-api-response-body
+
+    In cursor mode every hit carries its sort values, if search_after is provided (sort values of
+    the last hit from previous page), results continue after it and start is ignored. Raises
+    InvalidSearchCursor if search_after does not match the sort of the query.
     """
     body: Dict[str, Any] = {}
     query: Dict[str, Any] = {}
@@ -882,14 +1000,27 @@ def search(
 
     body["query"] = query
 
+    if cursor:
+        # Document id breaks ties between equal sort values, so search_after cursors are stable.
+        # Every indexed entry has it, unlike fields added to the mapping later.
+        # Scores are tracked explicitly because custom sort disables scoring otherwise.
+        body["sort"] = body.get("sort", ["_score"]) + [{"_id": "asc"}]
+        body["track_scores"] = True
+        if search_after is not None:
+            if len(search_after) != len(body["sort"]):
+                raise InvalidSearchCursor(
+                    f"Search cursor has {len(search_after)} values, expected {len(body['sort'])}"
+                )
+            body["search_after"] = search_after
+            start = 0
+
     index_name = _index(es_index)
-    results = es_client.search(body, index_name, size=size, from_=start)
+    results = await es_client.search(body, index_name, size=size, from_=start)
     hits = results.get("hits", {})
     return hits
 
 
 def search_cli(
-    es_client: elasticsearch.Elasticsearch,
     es_index: Union[str, UUID],
     journal_id: Union[str, UUID],
     q: str,
@@ -900,10 +1031,29 @@ def search_cli(
     **kwargs,
 ):
     """
-    Wraps search function so that it's callable from the CLI.
+    Wraps search function so that it's callable from the CLI. Queries Elasticsearch through
+    an asynchronous client created from environment variables.
     """
     search_query = normalized_search_query(q, filters, strict_filter_mode=strict)
-    return search(es_client, es_index, journal_id, search_query, size, start)
+    return asyncio.run(
+        _search_with_async_client(es_index, journal_id, search_query, size, start)
+    )
+
+
+async def _search_with_async_client(
+    es_index: Union[str, UUID],
+    journal_id: Union[str, UUID],
+    search_query: SearchQuery,
+    size: int,
+    start: int,
+) -> Dict[str, Any]:
+    async_es_client = async_es_client_from_env()
+    try:
+        return await search(
+            async_es_client, es_index, journal_id, search_query, size, start
+        )
+    finally:
+        await async_es_client.close()
 
 
 def search_db_cli(
@@ -942,7 +1092,9 @@ def set_index_cli(
         db_session = next(yield_connection_from_env())
 
     try:
-        journal_id_uuid = UUID(str(journal_id))
+        journal_id_uuid = (
+            journal_id if isinstance(journal_id, UUID) else UUID(journal_id)
+        )
         journal = db_session.query(Journal).filter(Journal.id == journal_id_uuid).one()
         journal.search_index = index
         db_session.commit()
@@ -1009,7 +1161,8 @@ def generate_argument_parser() -> argparse.ArgumentParser:
     search_parser.add_argument(
         "--strict", action="store_true", help="Strict filter mode?"
     )
-    search_parser.set_defaults(func=print_return_value(search_cli))
+    # search_cli creates its own asynchronous client
+    search_parser.set_defaults(func=print_return_value(search_cli), es_client=None)
 
     search_db_parser = subparsers.add_parser("search-db", description="Database search")
     search_db_parser.add_argument("-j", "--journal-id", required=True)
@@ -1080,7 +1233,8 @@ def main() -> None:
     """
     parser = generate_argument_parser()
     args = parser.parse_args()
-    args.es_client = es_client_from_env()
+    if "es_client" not in args:
+        args.es_client = es_client_from_env()
     args.db_session = None
     args.func(**vars(args))
 
@@ -75,6 +75,34 @@ except:
         f"Could not parse BUGOUT_SPIRE_THREAD_DB_MAX_OVERFLOW as int: {BUGOUT_SPIRE_THREAD_DB_MAX_OVERFLOW_RAW}"
     )
 
+# Journal permissions are cached per process, other workers see permission changes only after
+# cache entry expires
+SPIRE_PERMISSIONS_CACHE_TTL_SECONDS_RAW = os.environ.get(
+    "SPIRE_PERMISSIONS_CACHE_TTL_SECONDS"
+)
+SPIRE_PERMISSIONS_CACHE_TTL_SECONDS = 1
+try:
+    if SPIRE_PERMISSIONS_CACHE_TTL_SECONDS_RAW is not None:
+        SPIRE_PERMISSIONS_CACHE_TTL_SECONDS = int(
+            SPIRE_PERMISSIONS_CACHE_TTL_SECONDS_RAW
+        )
+except:
+    raise ValueError(
+        f"SPIRE_PERMISSIONS_CACHE_TTL_SECONDS must be an integer: {SPIRE_PERMISSIONS_CACHE_TTL_SECONDS_RAW}"
+    )
+
+SPIRE_PERMISSIONS_CACHE_MAX_SIZE_RAW = os.environ.get(
+    "SPIRE_PERMISSIONS_CACHE_MAX_SIZE"
+)
+SPIRE_PERMISSIONS_CACHE_MAX_SIZE = 10000
+try:
+    if SPIRE_PERMISSIONS_CACHE_MAX_SIZE_RAW is not None:
+        SPIRE_PERMISSIONS_CACHE_MAX_SIZE = int(SPIRE_PERMISSIONS_CACHE_MAX_SIZE_RAW)
+except:
+    raise ValueError(
+        f"SPIRE_PERMISSIONS_CACHE_MAX_SIZE must be an integer: {SPIRE_PERMISSIONS_CACHE_MAX_SIZE_RAW}"
+    )
+
 BUGOUT_CLIENT_ID_HEADER_RAW = os.environ.get("BUGOUT_CLIENT_ID_HEADER")
 if BUGOUT_CLIENT_ID_HEADER_RAW is not None:
     BUGOUT_CLIENT_ID_HEADER = BUGOUT_CLIENT_ID_HEADER_RAW
@@ -139,6 +167,8 @@ SPIRE_RAW_ORIGINS_LST = SPIRE_RAW_ORIGINS.split(",")
 
 DEFAULT_JOURNALS_ES_INDEX = "bugout-main"
 BULK_CHUNKSIZE = 1000
+BULK_MAX_CHUNK_BYTES = 10 * 1024 * 1024
+BULK_REQUEST_TIMEOUT = 30
 
 # Drones AWS bucket
 DRONES_BUCKET = os.environ.get("BUGOUT_AWS_S3_DRONES_BUCKET")